@@ -1,25 +1,47 @@
 #A* 4 direções, custo ao ENTRAR, heurística Manhattan×1
 import heapq
+from array import array
+from map_loader import get_compiled, get_padded
+from bucket_queue import BucketQueue, wants_bucket
 
 def _manhattan(a, b):
     return abs(a[0]-b[0]) + abs(a[1]-b[1])
 
-def _in_bounds(grid, r, c):
-    return 0 <= r < len(grid) and 0 <= c < len(grid[r])
-
-def astar(mapdata, src, dst, terrain_cost_func):
-    grid = mapdata["grid"]
+def astar(mapdata, src, dst, terrain_cost_func, queue="heap", heuristic=None, engine=None):
+    """
+    queue: "heap" (heapq) ou "bucket" (BucketQueue: baldes por f, desempate pelo
+    maior g, sem entradas obsoletas). "bucket" exige custos inteiros.
+    heuristic: h(cell, goal) admissível e consistente; padrão _manhattan
+    (ex.: landmarks.Landmarks para ALT).
+    engine: motor pré-processado com query(src, dst) (ex.: hpa.HPAStar, custo
+    aproximado) no lugar da busca na grade; queue/heuristic são ignorados.
+    """
+    if engine is not None:
+        return engine.query(src, dst)
+    if heuristic is None:
+        heuristic = _manhattan
     if src is None or dst is None:
         return float("inf"), []
+    cg = get_compiled(mapdata, terrain_cost_func)
+    rows, cols = cg["rows"], cg["cols"]
+    cost_at, blocked = cg["cost"], cg["blocked"]
+    use_bucket = wants_bucket(queue, cg["integral"])
 
     start, goal = src, dst
     g = {start: 0.0}
     parent = {start: None}
-    pq = [(0.0, start)]
+    if use_bucket:
+        pq = BucketQueue()
+        pq.push(start, 0, 0)
+    else:
+        pq = [(0.0, start)]
     closed = set()
 
     while pq:
-        f, u = heapq.heappop(pq)
+        if use_bucket:
+            u, f = pq.pop()
+        else:
+            f, u = heapq.heappop(pq)
         if u in closed:
             continue
         closed.add(u)
@@ -37,35 +59,202 @@ def astar(mapdata, src, dst, terrain_cost_func):
         r, c = u
         for dr, dc in ((-1,0), (1,0), (0,-1), (0,1)):  # sem diagonais
             vr, vc = r+dr, c+dc
-            if not _in_bounds(grid, vr, vc):
+            if not (0 <= vr < rows and 0 <= vc < cols):
                 continue
-            ch = grid[vr][vc]
-            cost = terrain_cost_func(ch)
-            if cost is None:               # bloqueado 
+            idx = vr*cols + vc
+            if blocked[idx]:               # bloqueado 
                 continue
-            ng = g[u] + float(cost)   
+            ng = g[u] + float(cost_at[idx])   
             if (vr, vc) not in g or ng < g[(vr, vc)]:
                 g[(vr, vc)] = ng
                 parent[(vr, vc)] = u
-                h = _manhattan((vr, vc), goal) * 1.0
-                heapq.heappush(pq, (ng + h, (vr, vc)))
+                h = heuristic((vr, vc), goal) * 1.0
+                if use_bucket:
+                    pq.push((vr, vc), ng + h, ng)
+                else:
+                    heapq.heappush(pq, (ng + h, (vr, vc)))
 
     return float("inf"), []
 
 
-def astar_debug(mapdata, src, dst, terrain_cost_func, print_every=2000, print_full=False):
+def astar_indexed(mapdata, src, dst, terrain_cost_func):
+    """
+    Mesmo A* (4 direções, custo ao ENTRAR, Manhattan×1) sobre células inteiras.
+    Células = índices da grade acolchoada; g em array('d'), pai em array('i'),
+    fechados num bytearray (iniciado com as células bloqueadas, menos src: como
+    astar, uma origem bloqueada ainda é expandida) e fila com chaves inteiras
+    f*N + v, que desempatam como (f, (r, c)) em astar.
+    Retorna (custo, caminho) como astar.
+    """
+    if src is None or dst is None:
+        return float("inf"), []
+    cg = get_compiled(mapdata, terrain_cost_func)
+    if not cg["integral"]:
+        # custos não inteiros: chave f*N + v não vale, usa o A* por tuplas
+        return astar(mapdata, src, dst, terrain_cost_func)
+    pg = get_padded(cg)
+    W, n = pg["width"], pg["size"]
+    cost_at, row_of, col_of = pg["cost"], pg["row"], pg["col"]
+
+    s = (src[0]+1)*W + src[1]+1
+    t = (dst[0]+1)*W + dst[1]+1
+    gr, gc = dst[0]+1, dst[1]+1
+    INF = float("inf")
+    g = array('d', [INF]) * n
+    parent = array('i', [-1]) * n
+    closed = bytearray(pg["blocked"])
+    closed[s] = 0
+    g[s] = 0.0
+    pq = [s]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        u = pop(pq) % n
+        if closed[u]:
+            continue
+        closed[u] = 1
+        if u == t:
+            path = []
+            x = u
+            while x != -1:
+                path.append((row_of[x]-1, col_of[x]-1))
+                x = parent[x]
+            path.reverse()
+            return g[u], path
+
+        gu = g[u]
+        # h do vizinho = h(u) ± 1 conforme o passo aproxima/afasta do alvo;
+        # vizinhos desenrolados (cima, baixo, esquerda, direita) para evitar o laço
+        ru, cu = row_of[u], col_of[u]
+        hr, hc = abs(ru-gr), abs(cu-gc)
+        v = u - W
+        if not closed[v]:                  # fechado ou bloqueado (inclui a borda)
+            ng = gu + cost_at[v]
+            if ng < g[v]:
+                g[v] = ng
+                parent[v] = u
+                push(pq, int(ng + hc + (hr-1 if ru > gr else hr+1))*n + v)
+        v = u + W
+        if not closed[v]:
+            ng = gu + cost_at[v]
+            if ng < g[v]:
+                g[v] = ng
+                parent[v] = u
+                push(pq, int(ng + hc + (hr-1 if ru < gr else hr+1))*n + v)
+        v = u - 1
+        if not closed[v]:
+            ng = gu + cost_at[v]
+            if ng < g[v]:
+                g[v] = ng
+                parent[v] = u
+                push(pq, int(ng + hr + (hc-1 if cu > gc else hc+1))*n + v)
+        v = u + 1
+        if not closed[v]:
+            ng = gu + cost_at[v]
+            if ng < g[v]:
+                g[v] = ng
+                parent[v] = u
+                push(pq, int(ng + hr + (hc-1 if cu < gc else hc+1))*n + v)
+
+    return INF, []
+
+
+def astar_bidirectional(mapdata, src, dst, terrain_cost_func, stats=None):
+    """
+    A* bidirecional com potenciais médios: p(v) = (h_dst(v) - h_src(v)) / 2 na busca
+    de ida e -p(v) na de volta (Manhattan nos dois; ambos consistentes), chaves
+    dobradas para ficarem inteiras com custos inteiros.
+    Custo ao ENTRAR: a ida paga cost[v] ao entrar em v; a volta, que anda de x para um
+    predecessor y, paga cost[x] (a aresta real é y -> x), então g_volta(v) = custo de
+    v até dst sem contar cost[v] e g_ida(v) + g_volta(v) é um caminho inteiro.
+    Expande sempre o lado com menos entradas na fila e para quando a soma dos dois
+    topos >= 2 * melhor custo visto (a parada de Dijkstra bidirecional nos custos
+    reduzidos). stats: dict opcional; soma as expansões em stats["expanded"].
+    Retorna (custo, caminho) como astar.
+    """
+    if src is None or dst is None:
+        return float("inf"), []
+    cg = get_compiled(mapdata, terrain_cost_func)
+    pg = get_padded(cg)
+    W, n = pg["width"], pg["size"]
+    cost_at, row_of, col_of = pg["cost"], pg["row"], pg["col"]
+    INF = float("inf")
+
+    s = (src[0]+1)*W + src[1]+1
+    t = (dst[0]+1)*W + dst[1]+1
+    if pg["blocked"][s] or pg["blocked"][t]:
+        return INF, []
+    sr, sc, tr, tc = src[0]+1, src[1]+1, dst[0]+1, dst[1]+1
+
+    def pot(v):                            # 2 * p(v) da busca de ida
+        r, c = row_of[v], col_of[v]
+        return abs(r-tr) + abs(c-tc) - abs(r-sr) - abs(c-sc)
+
+    g = ({s: 0.0}, {t: 0.0})
+    parent = ({s: -1}, {t: -1})            # volta: parent = próxima célula rumo a dst
+    closed = (bytearray(pg["blocked"]), bytearray(pg["blocked"]))
+    pqs = ([(pot(s), s)], [(-pot(t), t)])
+    sign = (1, -1)
+    pop, push = heapq.heappop, heapq.heappush
+    best, meet = (0.0, s) if s == t else (INF, -1)
+    expanded = 0
+
+    while pqs[0] and pqs[1] and pqs[0][0][0] + pqs[1][0][0] < 2*best:
+        side = 0 if len(pqs[0]) <= len(pqs[1]) else 1
+        _, u = pop(pqs[side])
+        cl = closed[side]
+        if cl[u]:
+            continue
+        cl[u] = 1
+        expanded += 1
+        gs, go, ps, pq = g[side], g[side ^ 1], parent[side], pqs[side]
+        gu = gs[u]
+        step = cost_at[u] if side else 0   # volta: a aresta real v -> u custa cost[u]
+        for v in (u-W, u+W, u-1, u+1):
+            if cl[v]:                      # fechado ou bloqueado (inclui a borda)
+                continue
+            ng = gu + (step if side else cost_at[v])
+            if ng < gs.get(v, INF):
+                gs[v] = ng
+                ps[v] = u
+                push(pq, (2*ng + sign[side]*pot(v), v))
+                if v in go and ng + go[v] < best:
+                    best, meet = ng + go[v], v
+
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + expanded
+    if meet < 0:
+        return INF, []
+    path = []
+    x = meet
+    while x != -1:
+        path.append((row_of[x]-1, col_of[x]-1))
+        x = parent[0][x]
+    path.reverse()
+    x = parent[1][meet]
+    while x != -1:
+        path.append((row_of[x]-1, col_of[x]-1))
+        x = parent[1][x]
+    return float(best), path
+
+
+def astar_debug(mapdata, src, dst, terrain_cost_func, print_every=2000, print_full=False,
+                heuristic=None):
     """
     Igual ao A*, mas guarda fronteira (open) e visitados (closed) para visualização.
     print_every: printa contagens a cada N expansões.
     print_full:  se True, imprime o mapa final com overlay.
+    heuristic:   h(cell, goal); padrão _manhattan.
     Retorna (dist, path, opened_set, closed_set).
     """
+    if heuristic is None:
+        heuristic = _manhattan
     grid = mapdata["grid"]
     if src is None or dst is None:
         return float("inf"), [], set(), set()
-
-    def _manhattan(a, b): return abs(a[0]-b[0]) + abs(a[1]-b[1])
-    def _in_bounds(r, c): return 0 <= r < len(grid) and 0 <= c < len(grid[r])
+    cg = get_compiled(mapdata, terrain_cost_func)
+    rows, cols = cg["rows"], cg["cols"]
+    cost_at, blocked = cg["cost"], cg["blocked"]
 
     start, goal = src, dst
     g = {start: 0.0}
@@ -100,17 +289,16 @@ def astar_debug(mapdata, src, dst, terrain_cost_func, print_every=2000, print_fu
         r, c = u
         for dr, dc in ((-1,0),(1,0),(0,-1),(0,1)):
             vr, vc = r+dr, c+dc
-            if not _in_bounds(vr, vc):
+            if not (0 <= vr < rows and 0 <= vc < cols):
                 continue
-            ch = grid[vr][vc]
-            cost = terrain_cost_func(ch)
-            if cost is None:
+            idx = vr*cols + vc
+            if blocked[idx]:
                 continue
-            ng = g[u] + float(cost)
+            ng = g[u] + float(cost_at[idx])
             if (vr, vc) not in g or ng < g[(vr, vc)]:
                 g[(vr, vc)] = ng
                 parent[(vr, vc)] = u
-                h = _manhattan((vr, vc), goal)
+                h = heuristic((vr, vc), goal)
                 heapq.heappush(pq, (ng + h, (vr, vc)))
                 opened.add((vr, vc))
 
@@ -0,0 +1,93 @@
+# bucket_queue.py
+# Fila de prioridade monótona por baldes (Dial) para chaves inteiras pequenas.
+
+class BucketQueue:
+    """
+    Fila para buscas com custos inteiros e heurística consistente (f nunca diminui).
+    Baldes por f num dicionário + cursor que só anda para frente; dentro do balde,
+    sub-listas por h = f - g, então o desempate sai pelo MAIOR g (menor h).
+    push() de um item já na fila move o item (decrease-key em O(1) por troca com o
+    último da sub-lista), logo não ficam entradas obsoletas para pular depois.
+    Se vier uma chave menor que o cursor, o cursor volta (continua correto).
+    """
+
+    def __init__(self, tie_break_g=True):
+        self.tie_break_g = tie_break_g
+        self._buckets = {}   # f -> [sub-listas por h, menor h possivelmente não vazio]
+        self._where = {}     # item -> (f, h, posição na sub-lista)
+        self._cur = None     # menor f possivelmente não vazio
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, item):
+        return item in self._where
+
+    def push(self, item, f, g=0):
+        f = int(f)
+        h = f - int(g) if self.tie_break_g else 0
+        if h < 0:
+            h = 0
+        loc = self._where.get(item)
+        if loc is not None:
+            self._remove(item, loc)
+
+        bucket = self._buckets.get(f)
+        if bucket is None:
+            bucket = self._buckets[f] = [[], h]
+        slots = bucket[0]
+        while len(slots) <= h:
+            slots.append([])
+        if h < bucket[1]:
+            bucket[1] = h
+        lst = slots[h]
+        self._where[item] = (f, h, len(lst))
+        lst.append(item)
+        self._len += 1
+        if self._cur is None or f < self._cur:
+            self._cur = f
+
+    def pop(self):
+        """Remove e retorna (item, f) de menor f (desempate: maior g)."""
+        if not self._len:
+            raise IndexError("pop from empty BucketQueue")
+        buckets = self._buckets
+        while True:
+            bucket = buckets.get(self._cur)
+            if bucket is None:
+                self._cur += 1
+                continue
+            slots, lo = bucket
+            while lo < len(slots) and not slots[lo]:
+                lo += 1
+            if lo == len(slots):
+                del buckets[self._cur]
+                self._cur += 1
+                continue
+            bucket[1] = lo
+            item = slots[lo].pop()
+            del self._where[item]
+            self._len -= 1
+            return item, self._cur
+
+    def _remove(self, item, loc):
+        f, h, pos = loc
+        lst = self._buckets[f][0][h]
+        last = lst.pop()
+        if pos < len(lst):
+            lst[pos] = last
+            self._where[last] = (f, h, pos)
+        del self._where[item]
+        self._len -= 1
+
+
+def wants_bucket(queue, integral):
+    """Valida o parâmetro queue ("heap"/"bucket") das buscas; integral = custos inteiros?"""
+    if queue == "heap":
+        return False
+    if queue != "bucket":
+        raise ValueError(f"fila desconhecida: {queue!r} (use 'heap' ou 'bucket')")
+    if not integral:
+        raise ValueError("fila 'bucket' exige custos inteiros de terreno")
+    return True
@@ -0,0 +1,346 @@
+# ch.py
+# Contraction Hierarchies sobre a grade (4 direções, custo ao ENTRAR): pré-processamento
+# único, consulta bidirecional "para cima" entre células quaisquer e hierarquia em disco.
+import hashlib
+import heapq
+import os
+import struct
+import sys
+import time
+from array import array
+from map_loader import get_compiled, get_padded, terrain_cost
+
+INF = float("inf")
+CH_VERSION = 2
+WITNESS_SETTLE = 60    # limite de nós fechados por busca de testemunha (contração)
+ESTIMATE_SETTLE = 10   # idem, só para estimar a prioridade (mais atalhos, nunca menos)
+EDGE_WEIGHT = 4        # prioridade = EDGE_WEIGHT * diferença de arestas + vizinhos
+LEVEL_WEIGHT = 2       #   já contraídos + LEVEL_WEIGHT * nível na hierarquia
+
+_MAGIC = b"ERCH"
+_HEADER = struct.Struct("<4sHiiii32s")   # magic, versão, rows, cols, W, nós, grid_digest
+_ARRAYS = ["cells", "rank", "fwd_off", "fwd_to", "fwd_w", "fwd_mid",
+           "bwd_off", "bwd_to", "bwd_w", "bwd_mid"]
+
+
+class ContractionHierarchy:
+    """
+    Grafo dirigido das células livres (u -> v custa cost[v]); os nós são contraídos em
+    ordem de prioridade (diferença de arestas, vizinhos já contraídos e nível, com
+    atualização preguiçosa) e cada par entrada/saída de v sem caminho testemunha de
+    custo <= vira um atalho u -> w com o nó do meio guardado para desempacotar.
+    Busca de testemunha limitada a WITNESS_SETTLE nós (ESTIMATE_SETTLE na prioridade):
+    pode sobrar atalho a mais, nunca faltar, então as distâncias são exatas.
+    Depois da contração só ficam as arestas "para cima", em CSR de array('i'):
+      fwd_*[v]: v -> w com rank[w] > rank[v] (busca a partir da origem);
+      bwd_*[v]: u -> v com rank[u] > rank[v] (busca a partir do destino);
+    *_mid é o nó do meio do atalho (-1 = aresta da grade). save()/load() gravam só
+    esses arrays (little-endian), com o grid_digest da grade compilada no cabeçalho.
+    Exige custos inteiros, como landmarks.Landmarks.
+    """
+
+    def __init__(self, mapdata, terrain_cost_func=None, witness_settle=WITNESS_SETTLE):
+        t0 = time.perf_counter()
+        cg = get_compiled(mapdata, terrain_cost_func or terrain_cost)
+        if not cg["integral"]:
+            raise ValueError("contraction hierarchies exigem custos inteiros de terreno")
+        pg = get_padded(cg)
+        self.rows, self.cols, self.W = cg["rows"], cg["cols"], pg["width"]
+        self.digest = grid_digest(cg)
+        self.witness_settle = witness_settle
+        cells = array('i', (p for p in range(pg["size"]) if not pg["blocked"][p]))
+        self._set_cells(cells, pg["size"])
+        self._contract(pg)
+        self.build_time = time.perf_counter() - t0
+
+    def _set_cells(self, cells, size):
+        self.cells = cells
+        self.node_of = array('i', [-1]) * size
+        for k, p in enumerate(cells):
+            self.node_of[p] = k
+
+    # --- pré-processamento --------------------------------------------------------------
+
+    def _contract(self, pg):
+        W, cost = self.W, pg["cost"]
+        node_of = self.node_of
+        N = len(self.cells)
+        out = [{} for _ in range(N)]     # grafo restante: out[u][w] = custo
+        inn = [{} for _ in range(N)]     # inn[w][u] = custo
+        via = {}                         # u*N + w -> nó do meio do atalho u -> w
+        for u, p in enumerate(self.cells):
+            for q in (p-W, p+W, p-1, p+1):
+                w = node_of[q]
+                if w >= 0:
+                    out[u][w] = inn[w][u] = int(cost[q])
+        deleted = [0] * N
+        level = [0] * N
+        rank = array('i', [-1]) * N
+        fwd = [None] * N
+        bwd = [None] * N
+        self.n_shortcuts = 0
+
+        def shortcuts(v, settle):
+            res = []
+            ov = out[v]
+            for u, c1 in inn[v].items():
+                targets = {w: c1 + c2 for w, c2 in ov.items() if w != u}
+                if not targets:
+                    continue
+                d = _witness(out, N, u, v, targets, max(targets.values()), settle)
+                for w, c in targets.items():
+                    if d.get(w, INF) > c:
+                        res.append((u, w, c))
+            return res
+
+        def priority(v):
+            n = len(shortcuts(v, ESTIMATE_SETTLE))
+            return EDGE_WEIGHT * (n - len(inn[v]) - len(out[v])) + deleted[v] \
+                + LEVEL_WEIGHT * level[v]
+
+        pq = [(priority(v), v) for v in range(N)]
+        heapq.heapify(pq)
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            if rank[v] >= 0:
+                continue
+            prio = priority(v)
+            if pq and prio > pq[0][0]:
+                heapq.heappush(pq, (prio, v))      # prioridade velha: volta para a fila
+                continue
+            sc = shortcuts(v, self.witness_settle)
+            rank[v] = order
+            order += 1
+            fwd[v] = [(w, c, via.get(v*N + w, -1)) for w, c in out[v].items()]
+            bwd[v] = [(u, c, via.get(u*N + v, -1)) for u, c in inn[v].items()]
+            up = level[v] + 1
+            for w in out[v]:
+                del inn[w][v]
+                deleted[w] += 1
+                if level[w] < up:
+                    level[w] = up
+            for u in inn[v]:
+                del out[u][v]
+                deleted[u] += 1
+                if level[u] < up:
+                    level[u] = up
+            out[v] = inn[v] = None
+            for u, w, c in sc:
+                old = out[u].get(w)
+                if old is None or c < old:
+                    out[u][w] = inn[w][u] = c
+                    via[u*N + w] = v
+                    self.n_shortcuts += 1
+        self.rank = rank
+        self.fwd_off, self.fwd_to, self.fwd_w, self.fwd_mid = _csr(fwd)
+        self.bwd_off, self.bwd_to, self.bwd_w, self.bwd_mid = _csr(bwd)
+
+    # --- consultas ----------------------------------------------------------------------
+
+    def _node(self, cell):
+        if cell is None:
+            return -1
+        r, c = cell
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return -1
+        return self.node_of[(r+1)*self.W + c+1]
+
+    def query(self, src, dst, unpack=True):
+        """
+        (custo, caminho) de src a dst como astar.astar, por Dijkstra bidirecional só
+        nas arestas para cima; para quando o topo das duas filas passa do melhor custo.
+        unpack=False devolve (custo, []) sem desempacotar os atalhos.
+        """
+        s, t = self._node(src), self._node(dst)
+        if s < 0 or t < 0:
+            return INF, []
+        if s == t:
+            return 0.0, [src]
+        N = len(self.cells)
+        dist = ({s: 0}, {t: 0})
+        par = ({s: None}, {t: None})         # nó -> (anterior, meio)
+        pqs = ([s], [t])                     # chaves d*N + nó
+        arrs = ((self.fwd_off, self.fwd_to, self.fwd_w, self.fwd_mid),
+                (self.bwd_off, self.bwd_to, self.bwd_w, self.bwd_mid))
+        pop, push = heapq.heappop, heapq.heappush
+        best, meet = INF, -1
+        side = 0
+        while (pqs[0] and pqs[0][0] < best * N) or (pqs[1] and pqs[1][0] < best * N):
+            if not (pqs[side] and pqs[side][0] < best * N):
+                side ^= 1
+            d, x = divmod(pop(pqs[side]), N)
+            ds = dist[side]
+            if d > ds[x]:
+                side ^= 1
+                continue
+            other = dist[side ^ 1].get(x)
+            if other is not None and d + other < best:
+                best, meet = d + other, x
+            # stall-on-demand: chegar em x descendo de um nó mais alto já é mais barato,
+            # então d não é a distância de x e as arestas dele podem ficar de fora
+            soff, sto, swt, _ = arrs[side ^ 1]
+            if any(ds.get(sto[k], INF) + swt[k] < d for k in range(soff[x], soff[x+1])):
+                side ^= 1
+                continue
+            off, to, wt, mid = arrs[side]
+            ps, pq = par[side], pqs[side]
+            for k in range(off[x], off[x+1]):
+                y, nd = to[k], d + wt[k]
+                if nd < ds.get(y, INF):
+                    ds[y] = nd
+                    ps[y] = (x, mid[k])
+                    push(pq, nd*N + y)
+            side ^= 1
+        if meet < 0:
+            return INF, []
+        if not unpack:
+            return float(best), []
+
+        edges = []                           # arestas (de, para, meio) de s até t
+        x = meet
+        while par[0][x] is not None:
+            prev, m = par[0][x]
+            edges.append((prev, x, m))
+            x = prev
+        edges.reverse()
+        x = meet
+        while par[1][x] is not None:
+            nxt, m = par[1][x]
+            edges.append((x, nxt, m))
+            x = nxt
+        nodes = [s]
+        for a, b, m in edges:
+            nodes.extend(self._unpack(a, b, m))
+        W = self.W
+        return float(best), [(self.cells[k] // W - 1, self.cells[k] % W - 1) for k in nodes]
+
+    def _unpack(self, a, b, m):
+        """Nós depois de a no caminho a -> b (atalho com meio m), sem recursão."""
+        res = []
+        stack = [(a, b, m)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                res.append(b)
+                continue
+            # a -> m está em bwd[m] (rank de a maior) e m -> b em fwd[m]
+            stack.append((m, b, self._mid(self.fwd_off, self.fwd_to, self.fwd_mid, m, b)))
+            stack.append((a, m, self._mid(self.bwd_off, self.bwd_to, self.bwd_mid, m, a)))
+        return res
+
+    @staticmethod
+    def _mid(off, to, mid, x, y):
+        for k in range(off[x], off[x+1]):
+            if to[k] == y:
+                return mid[k]
+        raise KeyError((x, y))
+
+    # --- disco --------------------------------------------------------------------------
+
+    def nbytes(self):
+        """Bytes dos arrays da hierarquia (os mesmos gravados por save)."""
+        return sum(len(getattr(self, a)) * getattr(self, a).itemsize for a in _ARRAYS)
+
+    def save(self, path):
+        """Grava a hierarquia (atômico: arquivo temporário + os.replace)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, CH_VERSION, self.rows, self.cols, self.W,
+                                 len(self.cells), bytes.fromhex(self.digest)))
+            for name in _ARRAYS:
+                arr = getattr(self, name)
+                if sys.byteorder == "big":
+                    arr = array('i', arr)
+                    arr.byteswap()
+                f.write(struct.pack("<q", len(arr)))
+                f.write(arr.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mapdata, terrain_cost_func=None):
+        """
+        Hierarquia gravada por save() para a mesma grade compilada de mapdata (mesmo
+        mapa e mesmos custos). ValueError se o arquivo não é deste formato, está
+        truncado ou foi gerado para outra grade.
+        """
+        with open(path, "rb") as f:
+            raw = f.read()
+        if len(raw) < _HEADER.size:
+            raise ValueError(f"{path}: arquivo truncado")
+        magic, version, rows, cols, W, _, digest = _HEADER.unpack_from(raw, 0)
+        if magic != _MAGIC or version != CH_VERSION:
+            raise ValueError(f"{path}: não é uma hierarquia CH versão {CH_VERSION}")
+        cg = get_compiled(mapdata, terrain_cost_func or terrain_cost)
+        if digest.hex() != grid_digest(cg):
+            raise ValueError(f"{path}: hierarquia de outro mapa ou de outros custos")
+        self = cls.__new__(cls)
+        self.rows, self.cols, self.W = rows, cols, W
+        self.digest = digest.hex()
+        pos = _HEADER.size
+        for name in _ARRAYS:
+            if pos + 8 > len(raw):
+                raise ValueError(f"{path}: arquivo truncado")
+            (n,) = struct.unpack_from("<q", raw, pos)
+            pos += 8
+            if n < 0 or pos + 4*n > len(raw):
+                raise ValueError(f"{path}: arquivo truncado")
+            arr = array('i')
+            arr.frombytes(raw[pos:pos + 4*n])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            pos += 4*n
+            setattr(self, name, arr)
+        if pos != len(raw):
+            raise ValueError(f"{path}: sobram {len(raw) - pos} bytes depois dos arrays")
+        self._set_cells(self.cells, (rows + 2) * W)
+        self.build_time = None
+        self.n_shortcuts = None
+        self.witness_settle = None
+        return self
+
+
+def grid_digest(cg):
+    """sha256 (hex) das dimensões, custos e bloqueios da grade compilada."""
+    h = hashlib.sha256(struct.pack("<ii", cg["rows"], cg["cols"]))
+    h.update(bytes(memoryview(cg["cost"]).cast('B')))
+    h.update(bytes(cg["blocked"]))
+    return h.hexdigest()
+
+
+def _csr(lists):
+    off = array('i', [0])
+    to, wt, mid = array('i'), array('i'), array('i')
+    for edges in lists:
+        for y, c, m in edges:
+            to.append(y)
+            wt.append(c)
+            mid.append(m)
+        off.append(len(to))
+    return off, to, wt, mid
+
+
+def _witness(out, N, u, v, targets, limit, settle):
+    """Dijkstra de u no grafo restante sem v, até limit ou settle nós fechados."""
+    dist = {u: 0}
+    pq = [u]                             # chaves d*N + nó
+    pop, push = heapq.heappop, heapq.heappush
+    left = len(targets)
+    while pq and settle:
+        k = pop(pq)
+        d, x = divmod(k, N)
+        if d > dist[x]:
+            continue
+        if d > limit:
+            break
+        settle -= 1
+        if x in targets:
+            left -= 1
+            if not left:
+                break
+        for y, c in out[x].items():
+            nd = d + c
+            if y != v and nd < dist.get(y, INF):
+                dist[y] = nd
+                push(pq, nd*N + y)
+    return dist
@@ -0,0 +1,213 @@
+# hpa.py
+# HPA* (Hierarchical Pathfinding A*): grafo abstrato de entradas entre clusters da grade
+# compilada, para consultas em mapas bem maiores que mapa.txt (custo aproximado).
+import heapq
+import time
+from map_loader import get_compiled, get_padded, terrain_cost
+
+INF = float("inf")
+MAX_RUN = 6   # trechos de borda com >= MAX_RUN células livres ganham duas entradas (pontas)
+
+
+class HPAStar:
+    """
+    Grade compilada dividida em clusters cluster_size x cluster_size. A borda entre
+    dois clusters vizinhos é cortada em trechos livres com o mesmo par de terrenos
+    (assim um corredor barato não divide a entrada com a água ao lado); cada trecho
+    tem uma entrada (o meio) ou duas (as pontas, se tem >= MAX_RUN células): um par
+    de células vizinhas a | b, com arestas a -> b (custo de entrar em b) e b -> a.
+    Dentro de cada cluster,
+    um Dijkstra por entrada, restrito ao cluster e com o mesmo custo ao ENTRAR, dá as
+    arestas entre as entradas do cluster.
+    query(src, dst) liga src e dst às entradas dos seus clusters, roda A* (Manhattan)
+    no grafo abstrato e refina só os clusters da rota. O custo devolvido é o do caminho
+    refinado: >= o exato (caminhos que entram e saem de um cluster fora das entradas
+    ficam de fora).
+    """
+
+    def __init__(self, mapdata, cluster_size=16, terrain_cost_func=None):
+        if cluster_size < 2:
+            raise ValueError("cluster_size precisa ser >= 2")
+        t0 = time.perf_counter()
+        self.terrain_cost_func = terrain_cost_func or terrain_cost
+        cg = get_compiled(mapdata, self.terrain_cost_func)
+        pg = get_padded(cg)
+        self.S = cluster_size
+        self.rows, self.cols = cg["rows"], cg["cols"]
+        self.W = pg["width"]
+        self.cost, self.blocked = pg["cost"], pg["blocked"]
+        self.edges = {}              # entrada -> [(entrada, custo)]
+        self.by_cluster = {}         # (cr, cc) -> [entradas]
+        self.expanded = 0            # expansões (abstratas + refinamento) da última consulta
+        self._find_entrances()
+        self._link_clusters()
+        self.build_time = time.perf_counter() - t0
+
+    # --- pré-processamento --------------------------------------------------------------
+
+    def _pad(self, r, c):
+        return (r+1)*self.W + c+1
+
+    def _cluster(self, p):
+        return ((p // self.W - 1) // self.S, (p % self.W - 1) // self.S)
+
+    def _box(self, cl):
+        """Limites (r0, r1, c0, c1), inclusivos, do cluster cl."""
+        r0, c0 = cl[0]*self.S, cl[1]*self.S
+        return r0, min(r0 + self.S, self.rows) - 1, c0, min(c0 + self.S, self.cols) - 1
+
+    def _add_node(self, p):
+        if p not in self.edges:
+            self.edges[p] = []
+            self.by_cluster.setdefault(self._cluster(p), []).append(p)
+
+    def _add_entrance(self, a, b):
+        self._add_node(a)
+        self._add_node(b)
+        self.edges[a].append((b, self.cost[b]))
+        self.edges[b].append((a, self.cost[a]))
+
+    def _scan_border(self, pairs):
+        """pairs: [(a, b)] ao longo de uma borda; uma ou duas entradas por trecho."""
+        run = []
+        cost = self.cost
+        for a, b in pairs + [(None, None)]:
+            free = a is not None and not self.blocked[a] and not self.blocked[b]
+            if free and (not run or (cost[a], cost[b]) == (cost[run[-1][0]], cost[run[-1][1]])):
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= MAX_RUN:
+                    self._add_entrance(*run[0])
+                    self._add_entrance(*run[-1])
+                else:
+                    self._add_entrance(*run[len(run) // 2])
+                run = [(a, b)] if free else []
+
+    def _find_entrances(self):
+        S, rows, cols = self.S, self.rows, self.cols
+        for c in range(S - 1, cols - 1, S):          # bordas verticais (cluster à esquerda | direita)
+            for r0 in range(0, rows, S):
+                self._scan_border([(self._pad(r, c), self._pad(r, c+1))
+                                   for r in range(r0, min(r0 + S, rows))])
+        for r in range(S - 1, rows - 1, S):          # bordas horizontais (cima | baixo)
+            for c0 in range(0, cols, S):
+                self._scan_border([(self._pad(r, c), self._pad(r+1, c))
+                                   for c in range(c0, min(c0 + S, cols))])
+
+    def _dijkstra_box(self, src, box, reverse=False, targets=None):
+        """
+        Dijkstra dentro de box a partir de src. reverse=True dá d(v -> src).
+        Para cedo quando fecha todos os targets. Retorna (dist, parent) em dicts.
+        """
+        r0, r1, c0, c1 = box
+        W, cost, blocked = self.W, self.cost, self.blocked
+        dist = {src: 0}
+        parent = {src: None}
+        closed = set()
+        left = set(targets) if targets is not None else None
+        pq = [(0, src)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+            self.expanded += 1
+            if left is not None:
+                left.discard(u)
+                if not left:
+                    break
+            step = cost[u] if reverse else 0
+            for v in (u-W, u+W, u-1, u+1):
+                if blocked[v] or v in closed:
+                    continue
+                r, c = v // W - 1, v % W - 1
+                if not (r0 <= r <= r1 and c0 <= c <= c1):
+                    continue
+                nd = d + (step if reverse else cost[v])
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(pq, (nd, v))
+        return dist, parent
+
+    def _link_clusters(self):
+        for cl, nodes in self.by_cluster.items():
+            box = self._box(cl)
+            for a in nodes:
+                dist, _ = self._dijkstra_box(a, box, targets=nodes)
+                for b in nodes:
+                    if b != a and b in dist:
+                        self.edges[a].append((b, dist[b]))
+        self.n_nodes = len(self.edges)
+        self.n_edges = sum(len(e) for e in self.edges.values())
+
+    # --- consultas ----------------------------------------------------------------------
+
+    def query(self, src, dst):
+        """(custo, caminho) de src a dst como astar.astar, mas pelo grafo abstrato."""
+        self.expanded = 0
+        if src is None or dst is None:
+            return INF, []
+        s, t = self._pad(*src), self._pad(*dst)
+        if self.blocked[s] or self.blocked[t]:
+            return INF, []
+        if s == t:
+            return 0.0, [src]
+        cs, ct = self._cluster(s), self._cluster(t)
+        out_s, _ = self._dijkstra_box(s, self._box(cs))
+        in_t, _ = self._dijkstra_box(t, self._box(ct), reverse=True)
+        start_edges = [(p, out_s[p]) for p in self.by_cluster.get(cs, ()) if p in out_s]
+        if cs == ct and t in out_s:
+            start_edges.append((t, out_s[t]))
+        to_t = {p: in_t[p] for p in self.by_cluster.get(ct, ()) if p in in_t}
+
+        W, tr, tc = self.W, t // self.W, t % self.W
+        g = {s: 0}
+        parent = {s: None}
+        pq = [(0, s)]
+        closed = set()
+        while pq:
+            _, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+            self.expanded += 1
+            if u == t:
+                break
+            nbrs = start_edges + self.edges.get(s, []) if u == s else self.edges[u]
+            if u in to_t:
+                nbrs = nbrs + [(t, to_t[u])]
+            for v, w in nbrs:
+                ng = g[u] + w
+                if ng < g.get(v, INF):
+                    g[v] = ng
+                    parent[v] = u
+                    heapq.heappush(pq, (ng + abs(v // W - tr) + abs(v % W - tc), v))
+        if t not in closed:
+            return INF, []
+
+        abstract = []
+        x = t
+        while x is not None:
+            abstract.append(x)
+            x = parent[x]
+        abstract.reverse()
+        return float(g[t]), self._refine(abstract)
+
+    def _refine(self, abstract):
+        """Caminho na grade: cada par consecutivo é vizinho (entrada) ou do mesmo cluster."""
+        W = self.W
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            if abs(a - b) in (1, W) and self._cluster(a) != self._cluster(b):
+                path.append(b)
+                continue
+            _, parent = self._dijkstra_box(a, self._box(self._cluster(a)), targets=[b])
+            seg = []
+            x = b
+            while x != a:
+                seg.append(x)
+                x = parent[x]
+            path.extend(reversed(seg))
+        return [(p // W - 1, p % W - 1) for p in path]
@@ -0,0 +1,122 @@
+# landmarks.py
+# Heurística ALT (A*, Landmarks, desigualdade Triangular) para consultas repetidas no mesmo mapa.
+import heapq
+from array import array
+from map_loader import get_compiled, get_padded
+
+UNREACHABLE = 2**31 - 1   # sentinela em array('i')
+
+def _dijkstra_padded(pg, src, reverse=False):
+    """
+    Dijkstra completo na grade acolchoada a partir da célula acolchoada src.
+    reverse=False: d(src -> v) (custo ao ENTRAR em v).
+    reverse=True:  d(v -> src), i.e. o passo y -> x custa cost[x].
+    Retorna array('i') com UNREACHABLE onde não há caminho.
+    """
+    W, n = pg["width"], pg["size"]
+    cost_at = pg["cost"]
+    dist = array('i', [UNREACHABLE]) * n
+    closed = bytearray(pg["blocked"])
+    dist[src] = 0
+    pq = [src]
+    pop, push = heapq.heappop, heapq.heappush
+    while pq:
+        k = pop(pq)
+        u = k % n
+        if closed[u]:
+            continue
+        closed[u] = 1
+        du = k // n
+        step = cost_at[u] if reverse else 0
+        for v in (u-W, u+W, u-1, u+1):
+            if closed[v]:
+                continue
+            nd = du + (step if reverse else cost_at[v])
+            if nd < dist[v]:
+                dist[v] = nd
+                push(pq, nd*n + v)
+    return dist
+
+class Landmarks:
+    """
+    K landmarks com distâncias completas de/para cada um (array('i') por direção).
+    Chamável como heurística h(v, goal) com v, goal = (r, c):
+        max( Manhattan, max_L d(L,goal) - d(L,v), max_L d(v,L) - d(goal,L) )
+    admissível e consistente (custo ao ENTRAR >= 1), inteira, e pode substituir
+    _manhattan em astar.astar / pairwise.astar_multitarget.
+    """
+
+    def __init__(self, mapdata, k=8, terrain_cost_func=None, cells=None):
+        cg = get_compiled(mapdata, terrain_cost_func)
+        if not cg["integral"]:
+            raise ValueError("ALT exige custos inteiros de terreno")
+        self.pg = pg = get_padded(cg)
+        self.width = pg["width"]
+        self.cells = []
+        self.fwd = []   # d(L -> v)
+        self.bwd = []   # d(v -> L)
+        self._goal_cache = {}
+
+        if cells is not None:
+            for cell in cells:
+                self._add(cell)
+        else:
+            self._select_farthest(mapdata, k)
+
+    def _pad(self, cell):
+        return (cell[0]+1)*self.width + cell[1]+1
+
+    def _add(self, cell):
+        p = self._pad(cell)
+        self.cells.append(cell)
+        self.fwd.append(_dijkstra_padded(self.pg, p))
+        self.bwd.append(_dijkstra_padded(self.pg, p, reverse=True))
+
+    def _select_farthest(self, mapdata, k):
+        """Seleção por ponto mais distante: cada landmark maximiza a menor distância aos anteriores."""
+        W = self.width
+        seed = mapdata.get("start") or next(
+            ((p // W - 1, p % W - 1) for p, b in enumerate(self.pg["blocked"]) if not b), None)
+        if seed is None or k <= 0:
+            return
+        n = self.pg["size"]
+        near = _dijkstra_padded(self.pg, self._pad(seed))
+        for _ in range(k):
+            best, best_p = -1, -1
+            for p in range(n):
+                d = near[p]
+                if d != UNREACHABLE and d > best:
+                    best, best_p = d, p
+            if best <= 0:
+                break
+            self._add((best_p // W - 1, best_p % W - 1))
+            fwd = self.fwd[-1]
+            for p in range(n):
+                if fwd[p] < near[p]:
+                    near[p] = fwd[p]
+
+    def _goal_terms(self, goal):
+        terms = self._goal_cache.get(goal)
+        if terms is None:
+            t = self._pad(goal)
+            terms = []
+            for fwd, bwd in zip(self.fwd, self.bwd):
+                dLt, dtL = fwd[t], bwd[t]
+                terms.append((fwd, dLt if dLt != UNREACHABLE else None,
+                              bwd, dtL if dtL != UNREACHABLE else None))
+            self._goal_cache[goal] = terms
+        return terms
+
+    def __call__(self, v, goal):
+        h = abs(v[0]-goal[0]) + abs(v[1]-goal[1])
+        p = (v[0]+1)*self.width + v[1]+1
+        for fwd, dLt, bwd, dtL in self._goal_terms(goal):
+            if dLt is not None:
+                dLv = fwd[p]
+                if dLv != UNREACHABLE and dLt - dLv > h:
+                    h = dLt - dLv
+            if dtL is not None:
+                dvL = bwd[p]
+                if dvL != UNREACHABLE and dvL - dtL > h:
+                    h = dvL - dtL
+        return h
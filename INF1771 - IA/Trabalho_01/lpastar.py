@@ -0,0 +1,137 @@
+# lpastar.py
+# Replanejamento incremental (LPA*) de uma rota fixa src -> dst sob edições de terreno.
+import heapq
+from array import array
+from map_loader import get_compiled, get_padded, terrain_cost
+
+INF = float("inf")
+
+
+class LPAStar:
+    """
+    Lifelong Planning A* no mesmo modelo de astar.astar (4 direções, custo ao ENTRAR,
+    Manhattan×1 até dst; exige custos >= 1 para a heurística ser consistente).
+
+    g e rhs ficam em array('d') sobre a grade acolchoada e sobrevivem entre consultas:
+    update_cells(...) só recoloca na fila as células editadas e seus vizinhos, e
+    query() repara apenas a parte da árvore de busca que ficou inconsistente.
+    A grade (custos e bloqueados) é uma cópia: mapdata não é alterado.
+    D* Lite só seria preciso com a origem andando; aqui src e dst são fixos.
+    """
+
+    def __init__(self, mapdata, src, dst, terrain_cost_func=None):
+        self.terrain_cost_func = terrain_cost_func or terrain_cost
+        cg = get_compiled(mapdata, self.terrain_cost_func)
+        pg = get_padded(cg)
+        self.rows, self.cols = cg["rows"], cg["cols"]
+        self.W = W = pg["width"]
+        self.n = n = pg["size"]
+        self.cost = array('d', iter(pg["cost"]))
+        self.blocked = bytearray(pg["blocked"])
+        self.s = (src[0]+1)*W + src[1]+1
+        self.t = (dst[0]+1)*W + dst[1]+1
+        self.tr, self.tc = dst[0]+1, dst[1]+1
+        self.g = array('d', [INF]) * n
+        self.rhs = array('d', [INF]) * n
+        self.qkey = [None] * n       # chave atual de quem está na fila (remoção preguiçosa)
+        self.pq = []
+        self.expanded = 0            # expansões da última consulta
+        self.rhs[self.s] = 0.0
+        self._push(self.s)
+
+    def _h(self, v):
+        W = self.W
+        return abs(v // W - self.tr) + abs(v % W - self.tc)
+
+    def _key(self, v):
+        m = min(self.g[v], self.rhs[v])
+        return (m + self._h(v), m)
+
+    def _push(self, v):
+        k = self._key(v)
+        self.qkey[v] = k
+        heapq.heappush(self.pq, (k[0], k[1], v))
+
+    def _update_vertex(self, v):
+        if v != self.s:
+            best = INF
+            if not self.blocked[v]:
+                g, blocked, W = self.g, self.blocked, self.W
+                for u in (v-W, v+W, v-1, v+1):
+                    if not blocked[u] and g[u] < best:
+                        best = g[u]
+                best += self.cost[v]
+            self.rhs[v] = best
+        if self.g[v] != self.rhs[v]:
+            self._push(v)
+        else:
+            self.qkey[v] = None
+
+    def _top_key(self):
+        pq, qkey = self.pq, self.qkey
+        while pq:
+            k1, k2, v = pq[0]
+            if qkey[v] == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(pq)        # entrada obsoleta
+        return (INF, INF)
+
+    def query(self):
+        """(custo, caminho) de src a dst, como astar.astar; repara só o necessário."""
+        g, rhs, W, t = self.g, self.rhs, self.W, self.t
+        expanded = 0
+        while self._top_key() < self._key(t) or rhs[t] != g[t]:
+            _, _, u = heapq.heappop(self.pq)
+            self.qkey[u] = None
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for v in (u-W, u+W, u-1, u+1):
+                if not self.blocked[v]:
+                    self._update_vertex(v)
+        self.expanded = expanded
+        if g[t] == INF:
+            return INF, []
+        return g[t], self._path()
+
+    def _path(self):
+        """Volta de dst sempre pelo predecessor de menor g (g(u) + cost(v) == g(v))."""
+        g, blocked, W = self.g, self.blocked, self.W
+        v = self.t
+        path = [v]
+        while v != self.s:
+            v = min((u for u in (v-W, v+W, v-1, v+1) if not blocked[u]), key=lambda u: g[u])
+            path.append(v)
+        path.reverse()
+        return [(v // W - 1, v % W - 1) for v in path]
+
+    def update_cells(self, changes):
+        """
+        changes: {(r, c): caractere de terreno novo} (ou iterável de pares).
+        Custo pela terrain_cost_func; None bloqueia. Células fora da grade são ignoradas.
+        Retorna quantas células mudaram de fato; a rota só é reparada no próximo query().
+        """
+        items = changes.items() if isinstance(changes, dict) else changes
+        W, changed = self.W, []
+        for (r, c), ch in items:
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                continue
+            v = (r+1)*W + c+1
+            cv = self.terrain_cost_func(ch)
+            blocked = 1 if cv is None else 0
+            cv = 0.0 if cv is None else float(cv)
+            if blocked == self.blocked[v] and (blocked or cv == self.cost[v]):
+                continue
+            self.cost[v] = cv
+            self.blocked[v] = blocked
+            changed.append(v)
+        # entrar em v mudou: rhs(v); v (des)bloqueado: também as arestas que saem dele
+        touched = set(changed)
+        for v in changed:
+            touched.update((v-W, v+W, v-1, v+1))
+        for v in touched:
+            self._update_vertex(v)
+        return len(changed)
@@ -1,21 +1,97 @@
-import time
 import os
-from map_loader import load_map, terrain_cost
-from astar import astar, astar_debug
-from pairwise import build_pairwise
-from tsp_held_karp import solve_tsp_path
+from map_loader import parse_map, compile_grid, terrain_cost
+from astar import astar_debug
+from pairwise_cache import pairwise_cached, tour_cached
+from tsp_held_karp import solve_tsp_path, DP_MAX_EVENTS
+from tsp_session import TSPSession
+from tsp_anytime import solve_tsp_path_anytime
 from runes import allocate_runes_optimal
+from stages import StageGraph, file_input, value_input
 from config import TERRAIN_COST, EVENT_DIFFICULTY, RUNES
 
+try:
+    import numpy as np
+except ImportError:  # sem NumPy: replan sem sessao incremental
+    np = None
+
 class EldenRingAgent:
-    def __init__(self, map_path="mapa.txt"):
-        """Inicializa o agente com o mapa especificado."""
+    def __init__(self, map_path="mapa.txt", workers=1, tsp_mode="exact", tsp_time_budget=1.0):
+        """Inicializa o agente com o mapa especificado.
+        workers: processos para as distancias (padrao 1 = serial; > 1 usa um pool).
+        tsp_mode: "exact" (Held-Karp / branch-and-bound) ou "anytime" (2-opt/Or-opt
+        com orcamento de tsp_time_budget segundos).
+        As etapas (mapa -> grade compilada -> distancias -> rota -> runas -> custo)
+        ficam num stages.StageGraph: cada uma e calculada uma vez e so refeita quando
+        o arquivo do mapa, TERRAIN_COST, EVENT_DIFFICULTY, RUNES ou o modo de TSP mudam."""
         self.map_path = map_path
+        self.workers = workers
+        self.tsp_mode = tsp_mode
+        self.tsp_time_budget = tsp_time_budget
         self.map_data = None
         self.pairwise_data = None
         self.travel_order = None
+        self.tsp_session = None
         self.rune_allocation = None
+        self.final_cost = None
         self.total_cost = 0
+        self.stages = self._build_stages()
+
+    def _build_stages(self):
+        g = StageGraph()
+        g.add("map", lambda: parse_map(self.map_path),
+              inputs=[file_input(lambda: self.map_path)])
+        g.add("compiled", lambda m: compile_grid(m["grid"], terrain_cost), deps=["map"],
+              inputs=[value_input(lambda: TERRAIN_COST)])
+        g.add("pairwise", self._compute_pairwise, deps=["map", "compiled"])
+        g.add("tour", self._compute_tour, deps=["pairwise"],
+              inputs=[value_input(lambda: (self.tsp_mode, self.tsp_time_budget))])
+        g.add("runes", self._compute_runes, deps=["tour"],
+              inputs=[value_input(lambda: EVENT_DIFFICULTY), value_input(lambda: RUNES)])
+        g.add("cost", self._compute_cost, deps=["tour", "runes"])
+        return g
+
+    def _stage(self, name):
+        """(valor, recalculado?, segundos do ultimo calculo) da etapa name."""
+        fresh = self.stages.fresh(name)
+        value = self.stages.get(name)
+        return value, not fresh, self.stages.stages[name].elapsed
+
+    def _compute_pairwise(self, mapdata, cg):
+        stats = {}
+        data = pairwise_cached(self.map_path, dict(mapdata, compiled=cg),
+                               workers=self.workers, stats=stats)
+        data["stats"] = stats
+        return data
+
+    def _compute_tour(self, data):
+        labels, dist = data["labels"], data["dist"]
+        if self.tsp_mode == "anytime":
+            print(f"[INFO] Resolvendo TSP com 2-opt/Or-opt (orcamento {self.tsp_time_budget:.1f}s)...")
+            def on_improve(cost, order, secs):
+                print(f"   [{secs:6.3f}s] rota com custo {cost}")
+            return solve_tsp_path_anytime(labels, dist, self.tsp_time_budget,
+                                          on_improve=on_improve)
+        if self.tsp_mode == "exact" and self.tsp_session is not None:
+            print("[INFO] Re-resolvendo TSP na sessao incremental...")
+            stats = {}
+            self.tsp_session.update(labels, dist)
+            travel_cost, order = self.tsp_session.solve(stats=stats)
+            print(f"[INFO] Estados recalculados: {stats['recomputed']}/{stats['masks']}")
+            return travel_cost, order
+        if self.tsp_mode == "exact":
+            print("[INFO] Resolvendo TSP com algoritmo Held-Karp...")
+            return tour_cached(data, solve_tsp_path)
+        raise ValueError(f"modo de TSP desconhecido: {self.tsp_mode!r} (use 'exact' ou 'anytime')")
+
+    def _compute_runes(self, tour):
+        _, order = tour
+        print("[INFO] Executando programacao dinamica para alocacao...")
+        return allocate_runes_optimal([x for x in order if x not in ('i', 'Z')])
+
+    def _compute_cost(self, tour, alloc):
+        travel_cost = tour[0]
+        events_time = alloc["total_event_time"]
+        return {"travel": travel_cost, "events": events_time, "total": travel_cost + events_time}
         
     def load_world(self):
         """Carrega o mundo e prepara os dados para busca."""
@@ -23,7 +99,11 @@ class EldenRingAgent:
         print("CARREGANDO MUNDO DE ELDEN RING")
         print("=" * 60)
         
-        self.map_data = load_map(self.map_path)
+        mapdata, fresh, elapsed = self._stage("map")
+        cg, _, _ = self._stage("compiled")
+        self.map_data = dict(mapdata, compiled=cg)
+        if fresh:
+            print(f"[OK] Mapa lido em {elapsed:.3f}s")
         print(f"[OK] Mapa carregado: {len(self.map_data['grid'])}x{len(self.map_data['grid'][0])}")
         print(f"[INFO] Origem: {self.map_data['start']}")
         print(f"[INFO] Destino: {self.map_data['goal']}")
@@ -39,13 +119,23 @@ class EldenRingAgent:
         print("CALCULANDO DISTANCIAS ENTRE PONTOS")
         print("=" * 60)
         
-        print("[INFO] Executando A* para todos os pares de pontos...")
-        start_time = time.time()
+        print(f"[INFO] Executando A* para todos os pares de pontos ({self.workers} processo(s))...")
+        self.pairwise_data, fresh, elapsed = self._stage("pairwise")
+        stats = self.pairwise_data["stats"]
         
-        self.pairwise_data = build_pairwise(self.map_data)
-        
-        elapsed = time.time() - start_time
-        print(f"[OK] Distancias calculadas em {elapsed:.2f}s")
+        if not fresh:
+            print("[OK] Distancias ja calculadas nesta sessao (etapa memoizada)")
+        elif self.pairwise_data["from_cache"]:
+            print(f"[OK] Distancias carregadas do cache em {elapsed:.3f}s")
+        else:
+            print(f"[OK] Distancias calculadas em {elapsed:.2f}s")
+            print(f"[INFO] Tempo de CPU das buscas: {stats['cpu_time']:.2f}s")
+            if self.workers > 1:
+                # CPU das buscas / tempo de parede do pool; o speedup contra
+                # workers=1 se mede em run_bench_pairwise.py
+                par = stats["cpu_time"] / stats["wall_time"]
+                print(f"[INFO] Eficiencia paralela (CPU / parede): {par:.2f}x em "
+                      f"{self.workers} processos ({100 * par / self.workers:.0f}%)")
         
         labels = self.pairwise_data["labels"]
         dist = self.pairwise_data["dist"]
@@ -59,22 +149,20 @@ class EldenRingAgent:
         for i, label in enumerate(labels[1:-1], 1):  # eventos
             print(f"   i -> {label}: {dist[0][i]} minutos")
             
-    def find_optimal_route(self):
-        """Encontra a rota otima usando TSP."""
+    def find_optimal_route(self, mode=None):
+        """Encontra a rota otima usando TSP.
+        mode: "exact" ou "anytime"; se dado, passa a ser self.tsp_mode."""
         print("\n" + "=" * 60)
         print("ENCONTRANDO ROTA OTIMA (TSP)")
         print("=" * 60)
         
-        labels = self.pairwise_data["labels"]
-        dist = self.pairwise_data["dist"]
-        
-        print("[INFO] Resolvendo TSP com algoritmo Held-Karp...")
-        start_time = time.time()
-        
-        travel_cost, order = solve_tsp_path(labels, dist)
-        
-        elapsed = time.time() - start_time
-        print(f"[OK] TSP resolvido em {elapsed:.2f}s")
+        if mode is not None:
+            self.tsp_mode = mode
+        (travel_cost, order), fresh, elapsed = self._stage("tour")
+        if fresh:
+            print(f"[OK] TSP resolvido em {elapsed:.2f}s")
+        else:
+            print("[OK] Rota ja calculada nesta sessao (etapa memoizada)")
         
         if travel_cost == float('inf') or not order:
             print("[ERRO] Nao existe rota viavel!")
@@ -90,21 +178,33 @@ class EldenRingAgent:
         
         return True
         
+    def replan(self):
+        """Recarrega mapa e distancias e re-resolve a rota depois de uma edicao.
+        Na primeira chamada cria a sessao incremental de TSP (tsp_session.TSPSession);
+        nas seguintes so os estados do Held-Karp afetados pela edicao sao recalculados.
+        Sem NumPy nao ha sessao e a rota sai de tour_cached(data, solve_tsp_path).
+        O mapa e sempre relido (uma edicao pode nao mudar mtime/tamanho); as etapas
+        seguintes so sao refeitas se o que elas leem mudou."""
+        self.stages.invalidate("map")
+        self.load_world()
+        self.calculate_distances()
+        labels = self.pairwise_data["labels"]
+        if np is not None and self.tsp_session is None and len(labels) - 2 <= DP_MAX_EVENTS:
+            self.tsp_session = TSPSession(labels, self.pairwise_data["dist"])
+            self.stages.invalidate("tour")
+        return self.find_optimal_route("exact")
+        
     def allocate_runes(self):
         """Aloca runas de forma otima para os eventos."""
         print("\n" + "=" * 60)
         print("ALOCANDO RUNAS DE FORMA OTIMA")
         print("=" * 60)
         
-        events_order = [x for x in self.travel_order if x not in ('i', 'Z')]
-        
-        print("[INFO] Executando programacao dinamica para alocacao...")
-        start_time = time.time()
-        
-        self.rune_allocation = allocate_runes_optimal(events_order)
-        
-        elapsed = time.time() - start_time
-        print(f"[OK] Alocacao otimizada em {elapsed:.2f}s")
+        self.rune_allocation, fresh, elapsed = self._stage("runes")
+        if fresh:
+            print(f"[OK] Alocacao otimizada em {elapsed:.2f}s")
+        else:
+            print("[OK] Alocacao ja calculada nesta sessao (etapa memoizada)")
         
         # Mostra detalhes da alocacao
         print(f"\n[INFO] Runas disponiveis:")
@@ -136,16 +236,11 @@ class EldenRingAgent:
         print("CALCULO DO CUSTO FINAL")
         print("=" * 60)
         
-        # Custo de viagem (ja calculado no TSP)
-        labels = self.pairwise_data["labels"]
-        dist = self.pairwise_data["dist"]
-        travel_cost, _ = solve_tsp_path(labels, dist)
-        
-        # Custo dos eventos
-        events_time = self.rune_allocation["total_event_time"]
-        
-        # Custo total
-        self.total_cost = travel_cost + events_time
+        # viagem (da etapa do TSP) + eventos (da etapa das runas)
+        self.final_cost, _, _ = self._stage("cost")
+        travel_cost = self.final_cost["travel"]
+        events_time = self.final_cost["events"]
+        self.total_cost = self.final_cost["total"]
         
         print(f"[INFO] Custo de viagem (A*): {int(travel_cost)} minutos")
         print(f"[INFO] Tempo dos eventos: {events_time:.2f} minutos")
@@ -273,6 +368,7 @@ class EldenRingAgent:
             
             # 9. Resumo final
             self.show_final_summary()
+            self.show_stage_report()
             
             return True
             
@@ -288,8 +384,8 @@ class EldenRingAgent:
         
         print(f"[RESULTADO] Rota otima: {' -> '.join(self.travel_order)}")
         print(f"[RESULTADO] Custo total: {self.total_cost:.2f} minutos")
-        print(f"[INFO] Tempo de viagem: {int(self.total_cost - self.rune_allocation['total_event_time'])} minutos")
-        print(f"[INFO] Tempo dos eventos: {self.rune_allocation['total_event_time']:.2f} minutos")
+        print(f"[INFO] Tempo de viagem: {int(self.final_cost['travel'])} minutos")
+        print(f"[INFO] Tempo dos eventos: {self.final_cost['events']:.2f} minutos")
         
         print(f"\n[INFO] Alocacao final das runas:")
         for name, used in self.rune_allocation["rune_usage"].items():
@@ -299,6 +395,17 @@ class EldenRingAgent:
         print(f"\n[INFO] Regra 'manter 1 runa inteira': {self.rune_allocation['keep_rule_ok']}")
         print(f"[OK] Simulacao concluida com sucesso!")
 
+    def show_stage_report(self):
+        """Mostra quantas vezes cada etapa foi calculada / reaproveitada e quanto levou."""
+        print("\n" + "=" * 60)
+        print("ETAPAS DA SESSAO")
+        print("=" * 60)
+        print(f"{'Etapa':<10} {'Calculos':<10} {'Reusos':<8} {'Ultimo (s)':<12} {'Total (s)':<10}")
+        print("-" * 60)
+        for row in self.stages.report():
+            print(f"{row['stage']:<10} {row['runs']:<10} {row['hits']:<8} "
+                  f"{row['last']:<12.3f} {row['total']:<10.3f}")
+
 def main():
     """Funcao principal do programa."""
     print("ELDEN RING - AGENTE INTELIGENTE")
@@ -320,4 +427,4 @@ def main():
     agent.run_complete_simulation(show_visualization=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
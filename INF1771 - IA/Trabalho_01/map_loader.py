@@ -1,5 +1,6 @@
 # map_loader.py
-from config import TERRAIN_COST, EVENT_CHARS
+from array import array
+from config import TERRAIN_COST, EVENT_CHARS, MAP_ROWS, MAP_COLS
 
 def _norm(ch):
     if ch == 'I': return 'i'
@@ -7,6 +8,12 @@ def _norm(ch):
     return ch
 
 def load_map(path):
+    mapdata = parse_map(path)
+    mapdata["compiled"] = compile_grid(mapdata["grid"], terrain_cost)
+    return mapdata
+
+def parse_map(path):
+    """Só a leitura do mapa (grade, i, Z, eventos), sem a grade compilada."""
     with open(path, "r", encoding="utf-8") as f:
         lines = f.read().splitlines()
 
@@ -33,3 +40,80 @@ def terrain_cost(ch):
     if ch in EVENT_CHARS:
         return 1
     return TERRAIN_COST.get(ch, None) 
+
+def compile_grid(grid, terrain_cost_func=None):
+    """
+    Pré-computa o custo de ENTRAR em cada célula num vetor plano (índice r*cols+c).
+    Dimensões: no mínimo MAP_ROWS x MAP_COLS; células fora do texto do mapa
+    ficam bloqueadas, assim como as de custo None.
+    Retorna {"rows", "cols", "cost", "blocked", "integral"}; "cost" é bytearray
+    quando todos os custos são inteiros 0..255 (caso do TERRAIN_COST, integral=True),
+    senão array('d').
+    """
+    if terrain_cost_func is None:
+        terrain_cost_func = terrain_cost
+    rows = max(MAP_ROWS, len(grid))
+    cols = max([MAP_COLS] + [len(row) for row in grid])
+    size = rows * cols
+
+    # um custo por caractere distinto, e não por célula
+    table = {}
+    for row in grid:
+        for ch in row:
+            if ch not in table:
+                table[ch] = terrain_cost_func(ch)
+
+    values = [v for v in table.values() if v is not None]
+    integral = all(isinstance(v, int) and 0 <= v <= 255 for v in values)
+    if integral:
+        cost = bytearray(size)
+    else:
+        cost = array('d', bytes(8 * size))
+    blocked = bytearray(b'\x01') * size
+
+    for r, row in enumerate(grid):
+        base = r * cols
+        for c, ch in enumerate(row):
+            v = table[ch]
+            if v is not None:
+                cost[base + c] = v
+                blocked[base + c] = 0
+
+    return {"rows": rows, "cols": cols, "cost": cost, "blocked": blocked, "integral": integral}
+
+def get_compiled(mapdata, terrain_cost_func=None):
+    """Grade compilada do mapa para a função de custo dada (reaproveita a de load_map)."""
+    if terrain_cost_func is None or terrain_cost_func is terrain_cost:
+        cg = mapdata.get("compiled")
+        if cg is None:
+            cg = compile_grid(mapdata["grid"], terrain_cost)
+            mapdata["compiled"] = cg
+        return cg
+    return compile_grid(mapdata["grid"], terrain_cost_func)
+
+def get_padded(cg):
+    """
+    Versão da grade compilada com uma borda bloqueada de 1 célula em volta,
+    para as buscas indexadas andarem por offsets (-W, +W, -1, +1) sem checar limites.
+    Índice acolchoado: (r+1)*W + (c+1), com W = cols+2. Fica em cache dentro de cg.
+    """
+    pg = cg.get("padded")
+    if pg is not None:
+        return pg
+    rows, cols = cg["rows"], cg["cols"]
+    W = cols + 2
+    size = (rows + 2) * W
+    src_cost, src_blocked = cg["cost"], cg["blocked"]
+    cost = bytearray(size) if cg["integral"] else array('d', bytes(8 * size))
+    blocked = bytearray(b'\x01') * size
+    for r in range(rows):
+        s = r * cols
+        d = (r + 1) * W + 1
+        cost[d:d+cols] = src_cost[s:s+cols]
+        blocked[d:d+cols] = src_blocked[s:s+cols]
+    row_of = array('i', [p // W for p in range(size)])
+    col_of = array('i', [p % W for p in range(size)])
+    pg = {"width": W, "size": size, "cost": cost, "blocked": blocked,
+          "row": row_of, "col": col_of}
+    cg["padded"] = pg
+    return pg
@@ -1,5 +1,10 @@
 import heapq
-from map_loader import terrain_cost
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from map_loader import terrain_cost, get_compiled
+from bucket_queue import BucketQueue, wants_bucket
 
 def get_pois(mapdata):
     labels = ['i'] + sorted(mapdata['events'].keys()) + ['Z']
@@ -12,65 +17,296 @@ def get_pois(mapdata):
 
 def _manhattan(a,b): return abs(a[0]-b[0]) + abs(a[1]-b[1])
 
-def _in_bounds(grid, r, c):
-    return 0 <= r < len(grid) and 0 <= c < len(grid[r])
+def _bounding_box(cells):
+    rs = [r for r, _ in cells]
+    cs = [c for _, c in cells]
+    return [min(rs), max(rs), min(cs), max(cs)]
 
-def astar_multitarget(mapdata, src, goals, terrain_cost_func):
-    """Um único A* encontrando distâncias para vários alvos; para quando achar todos."""
-    grid = mapdata["grid"]
+def astar_multitarget(mapdata, src, goals, terrain_cost_func, queue="heap", heuristic=None,
+                      stats=None):
+    """
+    Um único A* encontrando distâncias para vários alvos; para quando achar todos.
+    queue: "heap" ou "bucket" (ver astar.astar).
+    heuristic: None (padrão) = distância L1 até a caixa envolvente dos alvos restantes,
+               O(1) por push; ou h(cell, goal), com o mínimo sobre os alvos restantes
+               (ex.: _manhattan, o esquema antigo, ou landmarks.Landmarks).
+    stats: dict opcional; soma as expansões em stats["expanded"].
+    Quando um alvo é encontrado h só cresce; as chaves já na fila são re-chaveadas
+    preguiçosamente ao saírem (ver o laço principal).
+    """
+    cg = get_compiled(mapdata, terrain_cost_func)
+    rows, cols = cg["rows"], cg["cols"]
+    cost_at, blocked = cg["cost"], cg["blocked"]
+    use_bucket = wants_bucket(queue, cg["integral"])
     remaining = set(goals)
+    n_goals = len(remaining)
     dist_found = {}
 
     g = {src: 0.0}
     parent = {src: None}
 
-    def h_min(v):
-        if not remaining: return 0
-        return min(_manhattan(v, gk) for gk in remaining)
+    if heuristic is None:
+        # todos os alvos restantes estão na caixa, então a distância L1 até ela
+        # não passa da Manhattan até o mais próximo (admissível e consistente)
+        box = _bounding_box(remaining) if remaining else None
 
-    pq = [(h_min(src), src)]
+        def h_min(v):
+            if not remaining: return 0
+            r, c = v
+            r0, r1, c0, c1 = box
+            dr = r0 - r if r < r0 else (r - r1 if r > r1 else 0)
+            dc = c0 - c if c < c0 else (c - c1 if c > c1 else 0)
+            return dr + dc
+    else:
+        box = None
+
+        def h_min(v):
+            if not remaining: return 0
+            return min(heuristic(v, gk) for gk in remaining)
+
+    if use_bucket:
+        pq = BucketQueue()
+        pq.push(src, h_min(src), 0)
+    else:
+        pq = [(h_min(src), src)]
     closed = set()
+    expanded = 0
 
     while pq and remaining:
-        f, u = heapq.heappop(pq)
+        if use_bucket:
+            u, f = pq.pop()
+        else:
+            f, u = heapq.heappop(pq)
         if u in closed: continue
+        if len(remaining) < n_goals:
+            # h cresce quando um alvo sai de remaining: chave antiga pode estar
+            # baixa demais; reinsere com a chave atual antes de fechar u
+            f_now = g[u] + h_min(u)
+            if f_now > f:
+                if use_bucket:
+                    pq.push(u, f_now, g[u])
+                else:
+                    heapq.heappush(pq, (f_now, u))
+                continue
         closed.add(u)
+        expanded += 1
 
         if u in remaining:
             dist_found[u] = g[u]
             remaining.remove(u)
             if not remaining: break 
+            if box is not None:
+                box[:] = _bounding_box(remaining)
 
         r, c = u
         for dr, dc in ((-1,0),(1,0),(0,-1),(0,1)):
             vr, vc = r+dr, c+dc
-            if not _in_bounds(grid, vr, vc): continue
-            ch = grid[vr][vc]
-            cost = terrain_cost_func(ch)
-            if cost is None: continue
-            ng = g[u] + float(cost)
+            if not (0 <= vr < rows and 0 <= vc < cols): continue
+            idx = vr*cols + vc
+            if blocked[idx]: continue
+            ng = g[u] + float(cost_at[idx])
             if (vr, vc) not in g or ng < g[(vr, vc)]:
                 g[(vr, vc)] = ng
                 parent[(vr, vc)] = u
-                heapq.heappush(pq, (ng + h_min((vr, vc)), (vr, vc)))
+                if use_bucket:
+                    pq.push((vr, vc), ng + h_min((vr, vc)), ng)
+                else:
+                    heapq.heappush(pq, (ng + h_min((vr, vc)), (vr, vc)))
 
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + expanded
     return dist_found  # mapeia coord->custo
 
-def build_pairwise(mapdata):
+def _fill_row(dist, i, coords, found):
+    n = len(coords)
+    for j in range(n):
+        if i == j:
+            dist[i][j] = 0
+        else:
+            d = found.get(coords[j])
+            if d is not None:
+                dist[i][j] = int(d)
+
+def _source_goals(coords, i, symmetric):
+    n = len(coords)
+    return [coords[j] for j in range(n) if (j > i if symmetric else j != i)]
+
+def _mirror_lower(dist, coords, cg):
+    """
+    Custo ao ENTRAR: um caminho a->b custa o total do caminho menos cost(a), então
+    dist(b->a) = dist(a->b) - cost(b) + cost(a). Preenche o triângulo inferior.
+    """
+    cols, cost_at = cg["cols"], cg["cost"]
+    c = [cost_at[r*cols + col] for r, col in coords]
+    n = len(coords)
+    for i in range(n):
+        for j in range(i+1, n):
+            d = dist[i][j]
+            dist[j][i] = d if d == float('inf') else int(d - c[j] + c[i])
+
+def build_pairwise(mapdata, queue="heap", heuristic=None, stats=None, workers=1,
+                   symmetric=False, engine=None):
+    """
+    Matriz de distâncias entre i, eventos e Z (um astar_multitarget por origem).
+    queue/heuristic: repassados a astar_multitarget.
+    stats: dict opcional; recebe "expanded" (total), "expanded_by_source" (lista),
+           "cpu_time" (soma do tempo de CPU de cada busca) e "wall_time";
+           o speedup do modo paralelo se mede contra workers=1 (run_bench_pairwise).
+    workers: > 1 distribui as origens em processos (build_pairwise_parallel);
+             o resultado é idêntico ao serial.
+    symmetric: a origem k só busca os POIs de índice > k e o triângulo inferior sai
+               da identidade do custo ao entrar (_mirror_lower); ~metade das buscas.
+               Conferência contra a matriz completa: verify_symmetric.
+    engine: motor com query(src, dst) (ex.: hpa.HPAStar); cada entrada sai de uma
+            consulta ao motor, em série (workers/queue/heuristic ignorados). Com
+            symmetric, o espelhamento usa engine.terrain_cost_func (se houver).
+    """
+    if engine is not None:
+        return _build_pairwise_engine(mapdata, engine, stats, symmetric)
+    if workers is not None and workers > 1:
+        return build_pairwise_parallel(mapdata, workers, queue=queue, heuristic=heuristic,
+                                       stats=stats, symmetric=symmetric)
+    t_wall = time.perf_counter()
     labels, coords = get_pois(mapdata)
     n = len(coords)
     dist = [[float('inf')]*n for _ in range(n)]
     paths = {}  
 
     for i in range(n):
-        goals = [coords[j] for j in range(n) if j != i]
-        found = astar_multitarget(mapdata, coords[i], goals, terrain_cost)
+        goals = _source_goals(coords, i, symmetric)
+        st = {}
+        t0 = time.process_time()
+        found = astar_multitarget(mapdata, coords[i], goals, terrain_cost, queue=queue,
+                                  heuristic=heuristic, stats=st)
+        if stats is not None:
+            _add_source_stats(stats, st["expanded"], time.process_time() - t0)
         # preencher a linha i
-        for j in range(n):
-            if i == j:
-                dist[i][j] = 0
-            else:
-                d = found.get(coords[j])
-                if d is not None:
-                    dist[i][j] = int(d)
+        _fill_row(dist, i, coords, found)
+    if symmetric:
+        _mirror_lower(dist, coords, get_compiled(mapdata, terrain_cost))
+    if stats is not None:
+        stats["wall_time"] = time.perf_counter() - t_wall
     return {"labels": labels, "coords": coords, "dist": dist, "paths": paths}
+
+def _build_pairwise_engine(mapdata, engine, stats, symmetric):
+    t_wall = time.perf_counter()
+    labels, coords = get_pois(mapdata)
+    n = len(coords)
+    dist = [[float('inf')]*n for _ in range(n)]
+    for i in range(n):
+        found = {}
+        expanded = 0
+        t0 = time.process_time()
+        for goal in _source_goals(coords, i, symmetric):
+            d, _ = engine.query(coords[i], goal)
+            expanded += engine.expanded
+            if d != float('inf'):
+                found[goal] = d
+        if stats is not None:
+            _add_source_stats(stats, expanded, time.process_time() - t0)
+        _fill_row(dist, i, coords, found)
+    if symmetric:
+        cost_func = getattr(engine, "terrain_cost_func", terrain_cost)
+        _mirror_lower(dist, coords, get_compiled(mapdata, cost_func))
+    if stats is not None:
+        stats["wall_time"] = time.perf_counter() - t_wall
+    return {"labels": labels, "coords": coords, "dist": dist, "paths": {}}
+
+def _add_source_stats(stats, expanded, elapsed):
+    stats.setdefault("expanded_by_source", []).append(expanded)
+    stats["expanded"] = stats.get("expanded", 0) + expanded
+    stats["cpu_time"] = stats.get("cpu_time", 0.0) + elapsed
+
+# --- modo paralelo -----------------------------------------------------------
+# A grade compilada (custos + bloqueados) vai para um bloco de memória
+# compartilhada; cada worker só recebe o nome do bloco e as dimensões.
+
+_WORKER = {}
+
+def _pairwise_worker_init(shm_name, rows, cols, typecode, queue, heuristic):
+    _WORKER.update(shm_name=shm_name, rows=rows, cols=cols, typecode=typecode,
+                   queue=queue, heuristic=heuristic)
+
+def _pairwise_worker_row(task):
+    """Uma origem: liga-se ao bloco compartilhado só durante a busca e fecha no fim."""
+    i, src, goals = task
+    rows, cols, typecode = _WORKER["rows"], _WORKER["cols"], _WORKER["typecode"]
+    size = rows * cols
+    nbytes = size * (1 if typecode == 'B' else 8)
+    shm = shared_memory.SharedMemory(name=_WORKER["shm_name"])
+    cost = blocked = None
+    try:
+        cost = shm.buf[:nbytes].cast(typecode)
+        blocked = shm.buf[nbytes:nbytes + size]
+        cg = {"rows": rows, "cols": cols, "cost": cost, "blocked": blocked,
+              "integral": typecode == 'B'}
+        st = {}
+        t0 = time.process_time()
+        found = astar_multitarget({"compiled": cg}, src, goals, terrain_cost,
+                                  queue=_WORKER["queue"], heuristic=_WORKER["heuristic"],
+                                  stats=st)
+        return i, found, st["expanded"], time.process_time() - t0
+    finally:
+        cg = None
+        for view in (cost, blocked):
+            if view is not None:
+                view.release()
+        shm.close()
+
+def build_pairwise_parallel(mapdata, workers=None, queue="heap", heuristic=None, stats=None,
+                            symmetric=False):
+    """
+    Igual a build_pairwise, com as buscas por origem num ProcessPoolExecutor.
+    workers: número de processos (padrão os.cpu_count()).
+    heuristic precisa ser serializável (vai uma vez para cada worker).
+    """
+    t_wall = time.perf_counter()
+    labels, coords = get_pois(mapdata)
+    n = len(coords)
+    dist = [[float('inf')]*n for _ in range(n)]
+    paths = {}
+
+    cg = get_compiled(mapdata, terrain_cost)
+    rows, cols = cg["rows"], cg["cols"]
+    size = rows * cols
+    typecode = 'B' if cg["integral"] else 'd'
+    nbytes = size * (1 if typecode == 'B' else 8)
+
+    shm = shared_memory.SharedMemory(create=True, size=nbytes + size)
+    try:
+        shm.buf[:nbytes] = memoryview(cg["cost"]).cast('B')
+        shm.buf[nbytes:nbytes + size] = cg["blocked"]
+
+        tasks = [(i, coords[i], _source_goals(coords, i, symmetric)) for i in range(n)]
+        results = [None] * n
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_pairwise_worker_init,
+                                 initargs=(shm.name, rows, cols, typecode, queue, heuristic)) as ex:
+            for i, found, expanded, elapsed in ex.map(_pairwise_worker_row, tasks):
+                results[i] = (found, expanded, elapsed)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for i, (found, expanded, elapsed) in enumerate(results):
+        if stats is not None:
+            _add_source_stats(stats, expanded, elapsed)
+        _fill_row(dist, i, coords, found)
+    if symmetric:
+        _mirror_lower(dist, coords, cg)
+    if stats is not None:
+        stats["wall_time"] = time.perf_counter() - t_wall
+    return {"labels": labels, "coords": coords, "dist": dist, "paths": paths}
+
+def verify_symmetric(mapdata, **kwargs):
+    """
+    Confere o modo symmetric contra a matriz completa (todas as origens, todos os alvos).
+    Retorna a lista de divergências (label_a, label_b, completo, simétrico); vazia = ok.
+    """
+    full = build_pairwise(mapdata, **kwargs)
+    sym = build_pairwise(mapdata, symmetric=True, **kwargs)
+    labels = full["labels"]
+    n = len(labels)
+    return [(labels[i], labels[j], full["dist"][i][j], sym["dist"][i][j])
+            for i in range(n) for j in range(n)
+            if full["dist"][i][j] != sym["dist"][i][j]]
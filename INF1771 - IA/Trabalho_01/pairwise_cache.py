@@ -0,0 +1,152 @@
+# pairwise_cache.py
+# Cache em disco, endereçado por conteúdo, da matriz de distâncias (e da rota Held-Karp).
+import hashlib
+import os
+import struct
+from array import array
+from config import TERRAIN_COST, EVENT_CHARS
+from map_loader import load_map
+from pairwise import build_pairwise
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+ALGO_VERSION = 2      # incrementar quando mudar o modelo de custo ou o formato
+
+_MAGIC = b"ERPW"
+_HEADER = struct.Struct("<4sHH")   # magic, versão, n POIs
+_NO_VALUE = -1                     # inf / sem rota em array('q')
+
+def cache_key(map_path):
+    """sha256 dos bytes do mapa + TERRAIN_COST + EVENT_CHARS + ALGO_VERSION."""
+    h = hashlib.sha256()
+    with open(map_path, "rb") as f:
+        h.update(f.read())
+    h.update(repr(sorted(TERRAIN_COST.items())).encode())
+    h.update(repr(list(EVENT_CHARS)).encode())
+    h.update(str(ALGO_VERSION).encode())
+    return h.hexdigest()
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key + ".bin")
+
+def _encode(data, tour, solver):
+    labels, coords, dist = data["labels"], data["coords"], data["dist"]
+    n = len(labels)
+    out = [_HEADER.pack(_MAGIC, ALGO_VERSION, n)]
+    for lbl in labels:
+        b = lbl.encode("utf-8")
+        out.append(struct.pack("<B", len(b)) + b)
+    out.append(array('i', [v for rc in coords for v in rc]).tobytes())
+    out.append(array('q', [_NO_VALUE if d == float('inf') else int(d)
+                           for row in dist for d in row]).tobytes())
+    if tour is None:
+        out.append(struct.pack("<q", _NO_VALUE))
+    else:
+        cost, order = tour
+        idx = {lbl: k for k, lbl in enumerate(labels)}
+        tag = solver.encode("utf-8")
+        out.append(struct.pack("<qB", int(cost), len(tag)) + tag)
+        out.append(struct.pack("<H", len(order)))
+        out.append(array('H', [idx[lbl] for lbl in order]).tobytes())
+    return b"".join(out)
+
+def _decode(raw):
+    """
+    Inverso de _encode; None se o arquivo é de outro formato/versão, está truncado,
+    tem bytes sobrando ou índices de rota fora dos rótulos.
+    """
+    def take(size):
+        nonlocal pos
+        if pos + size > len(raw):
+            raise ValueError("truncado")
+        pos += size
+        return raw[pos - size:pos]
+
+    pos = 0
+    try:
+        magic, version, n = _HEADER.unpack(take(_HEADER.size))
+        if magic != _MAGIC or version != ALGO_VERSION:
+            return None
+        labels = [take(take(1)[0]).decode("utf-8") for _ in range(n)]
+        flat = array('i')
+        flat.frombytes(take(flat.itemsize * 2*n))
+        coords = [(flat[2*k], flat[2*k+1]) for k in range(n)]
+        cells = array('q')
+        cells.frombytes(take(cells.itemsize * n*n))
+        dist = [[float('inf') if d == _NO_VALUE else d for d in cells[i*n:(i+1)*n]]
+                for i in range(n)]
+        for i in range(n):
+            dist[i][i] = 0
+        (cost,) = struct.unpack("<q", take(8))
+        tour = solver = None
+        if cost != _NO_VALUE:
+            solver = take(take(1)[0]).decode("utf-8")
+            (m,) = struct.unpack("<H", take(2))
+            order = array('H')
+            order.frombytes(take(order.itemsize * m))
+            if any(k >= n for k in order):
+                return None
+            tour = (cost, [labels[k] for k in order])
+    except ValueError:                 # truncado ou UTF-8 inválido
+        return None
+    if pos != len(raw):
+        return None
+    return {"labels": labels, "coords": coords, "dist": dist, "paths": {}}, tour, solver
+
+def _read(key):
+    try:
+        with open(_entry_path(key), "rb") as f:
+            return _decode(f.read())
+    except OSError:
+        return None
+
+def _write(key, data, tour, solver=None):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _entry_path(key) + f".{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_encode(data, tour, solver))
+    os.replace(tmp, _entry_path(key))
+
+def pairwise_cached(map_path, mapdata=None, **build_kwargs):
+    """
+    build_pairwise com cache: num acerto nem o mapa é lido (além do hash).
+    build_kwargs vão para build_pairwise (workers, symmetric, stats...; todos dão a
+    mesma matriz). O dict retornado tem "from_cache" e, se já calculada, "tour" e
+    "tour_solver" (tag do solver que a calculou, ver tour_cached).
+    """
+    key = cache_key(map_path)
+    hit = _read(key)
+    if hit is not None:
+        data, tour, solver = hit
+        data.update(from_cache=True, tour=tour, tour_solver=solver, cache_key=key)
+        return data
+    if mapdata is None:
+        mapdata = load_map(map_path)
+    data = build_pairwise(mapdata, **build_kwargs)
+    _write(key, data, None)
+    data.update(from_cache=False, tour=None, tour_solver=None, cache_key=key)
+    return data
+
+def _solver_tag(solver):
+    """módulo.nome do solver; None para lambdas, funções locais e partials."""
+    name = getattr(solver, "__qualname__", None)
+    if name is None or "<" in name:
+        return None
+    return f"{solver.__module__}.{name}"
+
+def tour_cached(data, solver, tag=None):
+    """
+    Rota (custo, ordem) para data vindo de pairwise_cached: usa a guardada se foi
+    calculada pelo mesmo solver, senão chama solver(labels, dist) e grava no mesmo
+    arquivo (no lugar da rota de outro solver). Rotas inviáveis (inf) não são gravadas.
+    tag: identifica o solver no arquivo (padrão módulo.nome); sem tag (lambda,
+    partial) o cache de rota não é usado.
+    """
+    tag = tag or _solver_tag(solver)
+    if tag is not None and data.get("tour") is not None and data.get("tour_solver") == tag:
+        cost, order = data["tour"]
+        return cost, list(order)
+    cost, order = solver(data["labels"], data["dist"])
+    if tag is not None and cost != float('inf') and order:
+        data.update(tour=(cost, list(order)), tour_solver=tag)
+        _write(data["cache_key"], data, data["tour"], tag)
+    return cost, order
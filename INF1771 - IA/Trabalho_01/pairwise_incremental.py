@@ -0,0 +1,248 @@
+# pairwise_incremental.py
+# Matriz de distâncias entre POIs mantida sob edições de células ou de TERRAIN_COST:
+# só as origens com alguma entrada (origem, alvo) que pode ter mudado são re-buscadas.
+import heapq
+import time
+from array import array
+from map_loader import get_compiled, get_padded, terrain_cost
+from pairwise import get_pois
+
+INF = float("inf")
+UNREACHABLE = 2**31 - 1   # sentinela em array('i')
+
+
+def _dijkstra_tree(W, n, cost_at, blocked, src, targets):
+    """
+    Dijkstra (custo ao ENTRAR) a partir de src até fechar todos os targets.
+    Retorna (dist, parent, closed, radius): dist/parent em array('i'); closed marca as
+    células fechadas (com dist exata); toda célula aberta ou não vista tem distância
+    >= radius (inf se a busca esgotou a componente).
+    """
+    dist = array('i', [UNREACHABLE]) * n
+    parent = array('i', [-1]) * n
+    closed = bytearray(n)
+    done = bytearray(blocked)
+    dist[src] = 0
+    left = set(targets)
+    left.discard(src)
+    pq = [src]
+    pop, push = heapq.heappop, heapq.heappush
+    while pq:
+        k = pop(pq)
+        u = k % n
+        if done[u]:
+            continue
+        done[u] = closed[u] = 1
+        left.discard(u)
+        if not left:
+            return dist, parent, closed, k // n
+        du = k // n
+        for v in (u-W, u+W, u-1, u+1):
+            if done[v]:
+                continue
+            nd = du + cost_at[v]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                push(pq, nd*n + v)
+    return dist, parent, closed, INF
+
+
+class IncrementalPairwise:
+    """
+    Mesma matriz de build_pairwise, com uma árvore de caminhos mínimos por origem
+    (Dijkstra até o último POI) guardada como base. Cada edição é comparada com a
+    base de cada origem i (pendentes: células cujo custo mudou desde a base) e a
+    entrada (i, j) só é recalculada se:
+      - alguma pendente que ficou mais cara (ou bloqueada) está no caminho i -> j
+        da árvore; senão esse caminho continua valendo e d(i, j) não sobe;
+      - ou algum caminho pelas células mais baratas que na base de alguma origem (X)
+        pode ser mais curto: até a 1a delas o prefixo só usa células que não
+        baratearam em relação à base de i (custa >= d_i do vizinho de onde entra) e
+        depois da última o sufixo não barateou em relação à base de j (custa >=
+        d(vizinho -> j) = d_j(vizinho) - custo(vizinho) + custo(j)), então
+        min_x [custo(x) + min_viz d_i(viz)] + min_y [custo(j) + min_viz d_j(viz)] < d_i(j).
+    Uma origem com entrada marcada ganha nova árvore (e base); as outras ficam.
+    Exige custos inteiros, como landmarks.Landmarks.
+    """
+
+    def __init__(self, mapdata, terrain_cost_func=None):
+        self.terrain_cost_func = terrain_cost_func or terrain_cost
+        cg = get_compiled(mapdata, self.terrain_cost_func)
+        if not cg["integral"]:
+            raise ValueError("modo incremental exige custos inteiros de terreno")
+        pg = get_padded(cg)
+        self.rows, self.cols = cg["rows"], cg["cols"]
+        self.W, self.n = pg["width"], pg["size"]
+        self.cost = array('i', iter(pg["cost"]))
+        self.blocked = bytearray(pg["blocked"])
+        self.grid = [row[:] for row in mapdata["grid"]]
+        self.labels, self.coords = get_pois(mapdata)
+        self.poi = [self._pad(rc) for rc in self.coords]
+        k = len(self.poi)
+        self.dist = [[INF]*k for _ in range(k)]
+        self.rows_state = [None] * k
+        self.history = []            # stats de cada edição
+        for i in range(k):
+            self._search_row(i)
+
+    def _pad(self, cell):
+        return (cell[0]+1)*self.W + cell[1]+1
+
+    def _search_row(self, i):
+        """Nova árvore da origem i no grid atual; atualiza a linha i da matriz."""
+        dist, parent, closed, radius = _dijkstra_tree(self.W, self.n, self.cost, self.blocked,
+                                                      self.poi[i], self.poi)
+        on_path = {}                 # célula -> índices j cujo caminho da árvore passa nela
+        for j, t in enumerate(self.poi):
+            if j == i:
+                self.dist[i][j] = 0
+                continue
+            d = dist[t]
+            self.dist[i][j] = INF if d == UNREACHABLE or not closed[t] else d
+            if self.dist[i][j] == INF:
+                continue
+            v = t
+            while v != self.poi[i]:
+                on_path.setdefault(v, set()).add(j)
+                v = parent[v]
+        self.rows_state[i] = {"dist": dist, "closed": closed, "radius": radius,
+                              "on_path": on_path, "pending": {}}
+
+    def matrix(self):
+        """Dict no formato de build_pairwise (cópia da matriz atual)."""
+        return {"labels": list(self.labels), "coords": list(self.coords),
+                "dist": [row[:] for row in self.dist], "paths": {}}
+
+    def _lower(self, st, v):
+        """Limite inferior da distância base da origem até v."""
+        base = st["pending"].get(v)
+        if (base[1] if base is not None else self.blocked[v]):
+            return INF
+        return st["dist"][v] if st["closed"][v] else st["radius"]
+
+    def _cheaper(self, i):
+        """Pendentes da origem i hoje mais baratas que na base dela, ou desbloqueadas."""
+        return frozenset(v for v, (c_base, b_base) in self.rows_state[i]["pending"].items()
+                         if not self.blocked[v] and (b_base or self.cost[v] < c_base))
+
+    def _bounds(self, i, cheaper):
+        """
+        (prefixo, sufixo) da origem i sobre as células cheaper: menor custo até entrar
+        numa delas vindo da base de i, e menor custo de sair de uma delas até o POI i
+        (pela identidade d(w -> i) = d_i(w) - custo(w) + custo(i) na base de i).
+        """
+        st = self.rows_state[i]
+        src, W = self.poi[i], self.W
+        c_src = st["pending"].get(src, (self.cost[src], 0))[0]
+        pre = suf = INF
+        for x in cheaper:
+            if x == src:
+                return 0, 0
+            nb = min(self._lower(st, u) for u in (x-W, x+W, x-1, x+1))
+            if self.cost[x] + nb < pre:
+                pre = self.cost[x] + nb
+            if c_src + nb < suf:
+                suf = c_src + nb
+        return pre, suf
+
+    def _candidates(self, i, bounds, cheaper):
+        """
+        Alvos j da origem i cuja entrada pode ter mudado (ver docstring da classe).
+        cheaper[k]: _cheaper(k); bounds(k, conjunto): _bounds memoizado.
+        Para (i, j), X = cheaper[i] | cheaper[j] e os mínimos sobre X saem dos dois.
+        """
+        st = self.rows_state[i]
+        marked = set()
+        for v, (c_base, b_base) in st["pending"].items():
+            if not self.blocked[v] and (b_base or self.cost[v] < c_base):
+                continue                 # mais barata: vale o teste de baixo
+            marked |= st["on_path"].get(v, set())
+        for j in range(len(self.poi)):
+            if j == i or j in marked or not (cheaper[i] or cheaper[j]):
+                continue
+            pre = min(bounds(i, cheaper[i])[0], bounds(i, cheaper[j])[0])
+            suf = min(bounds(j, cheaper[i])[1], bounds(j, cheaper[j])[1])
+            if pre + suf < self.dist[i][j]:
+                marked.add(j)
+        return marked
+
+    def _apply(self, new_costs):
+        """new_costs: {célula acolchoada: custo ou None}. Registra pendentes e repara."""
+        t0 = time.perf_counter()
+        changed = 0
+        for v, cv in new_costs.items():
+            b = 1 if cv is None else 0
+            cv = 0 if cv is None else int(cv)
+            if b == self.blocked[v] and (b or cv == self.cost[v]):
+                continue
+            changed += 1
+            old = (self.cost[v], self.blocked[v])
+            for st in self.rows_state:
+                base = st["pending"].setdefault(v, old)
+                if base == (cv, b) or (b and base[1]):
+                    del st["pending"][v]
+            self.cost[v] = cv
+            self.blocked[v] = b
+
+        # testes todos sobre as bases antigas, antes de re-buscar qualquer linha
+        k = len(self.poi)
+        cheaper = [self._cheaper(i) for i in range(k)]
+        memo = {}
+
+        def bounds(i, cells):
+            key = (i, cells)
+            if key not in memo:
+                memo[key] = self._bounds(i, cells) if cells else (INF, INF)
+            return memo[key]
+
+        marked = [self._candidates(i, bounds, cheaper) for i in range(k)]
+        entries = rows = moved = 0
+        for i in range(k):
+            if not marked[i]:
+                continue
+            entries += len(marked[i])
+            rows += 1
+            before = self.dist[i][:]
+            self._search_row(i)
+            moved += sum(1 for j in range(k) if before[j] != self.dist[i][j])
+        stats = {"cells": changed, "entries": entries, "rows": rows, "changed": moved,
+                 "time": time.perf_counter() - t0}
+        self.history.append(stats)
+        return stats
+
+    def update_cells(self, changes):
+        """
+        changes: {(r, c): caractere de terreno novo} (ou iterável de pares).
+        Retorna stats da edição: "cells" (células que mudaram), "entries" (entradas da
+        matriz marcadas para recálculo), "rows" (origens re-buscadas), "changed"
+        (entradas cujo valor mudou) e "time".
+        """
+        items = changes.items() if isinstance(changes, dict) else changes
+        new_costs = {}
+        for (r, c), ch in items:
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                continue
+            while len(self.grid) <= r:
+                self.grid.append([])
+            row = self.grid[r]
+            if len(row) <= c:
+                row.extend(['#'] * (c + 1 - len(row)))
+            row[c] = ch
+            new_costs[(r+1)*self.W + c+1] = self.terrain_cost_func(ch)
+        return self._apply(new_costs)
+
+    def reload_costs(self):
+        """
+        Reaplica terrain_cost_func em todas as células (depois de editar TERRAIN_COST)
+        e repara como update_cells; retorna os mesmos stats.
+        """
+        table = {}
+        new_costs = {}
+        W = self.W
+        for r, row in enumerate(self.grid):
+            for c, ch in enumerate(row):
+                if ch not in table:
+                    table[ch] = self.terrain_cost_func(ch)
+                new_costs[(r+1)*W + c+1] = table[ch]
+        return self._apply(new_costs)
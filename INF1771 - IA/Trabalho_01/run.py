@@ -1,12 +1,12 @@
 # run_i_to_Z.py
 from map_loader import load_map, terrain_cost
-from astar import astar
+from astar import astar_indexed
 
 MAP_PATH = "mapa.txt" 
 
 if __name__ == "__main__":
     m = load_map(MAP_PATH)
-    dist, path = astar(m, m["start"], m["goal"], terrain_cost)
+    dist, path = astar_indexed(m, m["start"], m["goal"], terrain_cost)
     if dist == float("inf"):
         print("Sem caminho i->Z.")
     else:
@@ -0,0 +1,42 @@
+# run_alt.py
+# Relatório de expansões do build_pairwise com e sem a heurística ALT (landmarks).
+import time
+from map_loader import load_map, terrain_cost
+from pairwise import build_pairwise
+from astar import astar_debug
+from landmarks import Landmarks
+
+MAP_PATH = "mapa.txt"
+N_LANDMARKS = 8
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+
+    t0 = time.perf_counter()
+    lm = Landmarks(m, k=N_LANDMARKS)
+    t_pre = time.perf_counter() - t0
+    print(f"Landmarks ({len(lm.cells)}): {lm.cells}")
+    print(f"Pré-processamento: {t_pre:.2f}s")
+
+    st_man, st_alt = {}, {}
+    t0 = time.perf_counter()
+    base = build_pairwise(m, stats=st_man)
+    t_man = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    alt = build_pairwise(m, heuristic=lm, stats=st_alt)
+    t_alt = time.perf_counter() - t0
+
+    labels = base["labels"]
+    print("\n-- Expansões por origem (sem ALT / ALT) --")
+    for lbl, e_man, e_alt in zip(labels, st_man["expanded_by_source"], st_alt["expanded_by_source"]):
+        print(f"{lbl}: {e_man:>7} / {e_alt:>7}  ({e_alt / max(1, e_man):.0%})")
+    print(f"TOTAL: {st_man['expanded']} / {st_alt['expanded']}  "
+          f"({st_alt['expanded'] / max(1, st_man['expanded']):.0%})")
+    print(f"Tempo build_pairwise: {t_man:.2f}s (sem ALT)  {t_alt:.2f}s (ALT)")
+    print("Matrizes iguais?:", base["dist"] == alt["dist"])
+
+    # mesma comparação para a busca i -> Z de run_viz.py
+    _, _, _, closed_man = astar_debug(m, m["start"], m["goal"], terrain_cost, print_every=10**9)
+    _, _, _, closed_alt = astar_debug(m, m["start"], m["goal"], terrain_cost, print_every=10**9,
+                                      heuristic=lm)
+    print(f"\ni -> Z visitados: {len(closed_man)} (Manhattan)  {len(closed_alt)} (ALT)")
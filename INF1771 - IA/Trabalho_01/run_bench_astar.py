@@ -0,0 +1,41 @@
+# run_bench_astar.py
+import time
+from map_loader import load_map, terrain_cost
+from pairwise import get_pois, build_pairwise
+from astar import astar, astar_indexed
+
+MAP_PATH = "mapa.txt"
+REPEAT = 3
+
+def _bench(fn, m, pairs, **kw):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        total = 0
+        for a, b in pairs:
+            d, _ = fn(m, a, b, terrain_cost, **kw)
+            total += d
+        el = time.perf_counter() - t0
+        if best is None or el < best:
+            best = el
+    return best, total
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+    labels, coords = get_pois(m)
+    pairs = [(a, b) for a in coords for b in coords if a != b]
+
+    t_ref, tot_ref = _bench(astar, m, pairs)
+    t_idx, tot_idx = _bench(astar_indexed, m, pairs)
+    t_bkt, tot_bkt = _bench(astar, m, pairs, queue="bucket")
+
+    print("Pares:", len(pairs))
+    print(f"astar:         {t_ref:.3f}s  (soma dos custos {int(tot_ref)})")
+    print(f"astar_indexed: {t_idx:.3f}s  (soma dos custos {int(tot_idx)})")
+    print(f"astar(bucket): {t_bkt:.3f}s  (soma dos custos {int(tot_bkt)})")
+    print(f"Speedup indexed: {t_ref / t_idx:.2f}x   bucket: {t_ref / t_bkt:.2f}x")
+
+    for queue in ("heap", "bucket"):
+        t0 = time.perf_counter()
+        build_pairwise(m, queue=queue)
+        print(f"build_pairwise(queue={queue!r}): {time.perf_counter() - t0:.3f}s")
@@ -0,0 +1,49 @@
+# run_bench_bidirectional.py
+# A* bidirecional (astar_bidirectional) contra astar: expansões e tempo em todos os pares de POIs.
+import time
+from map_loader import load_map, terrain_cost
+from pairwise import get_pois
+from astar import astar, astar_indexed, astar_bidirectional, astar_debug
+
+MAP_PATH = "mapa.txt"
+N_SHOW = 5
+
+def _timed(fn, m, pairs, **kw):
+    t0 = time.perf_counter()
+    costs = [fn(m, a, b, terrain_cost, **kw)[0] for a, b in pairs]
+    return time.perf_counter() - t0, costs
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+    labels, coords = get_pois(m)
+    pairs = [(a, b) for a in coords for b in coords if a != b]
+    names = {rc: lab for lab, rc in zip(labels, coords)}
+
+    t_ref, ref = _timed(astar, m, pairs)
+    t_idx, _ = _timed(astar_indexed, m, pairs)
+    t_bi, bi = _timed(astar_bidirectional, m, pairs)
+
+    # expansões por par: fechados do A* (astar_debug) e stats do bidirecional
+    exp_uni, exp_bi = [], []
+    for a, b in pairs:
+        _, _, _, closed = astar_debug(m, a, b, terrain_cost, print_every=10**9)
+        exp_uni.append(len(closed))
+        st = {}
+        astar_bidirectional(m, a, b, terrain_cost, stats=st)
+        exp_bi.append(st["expanded"])
+
+    print("Pares:", len(pairs), "  custos iguais:", bi == ref)
+    print(f"astar:               {t_ref:.3f}s  expansões {sum(exp_uni)}")
+    print(f"astar_indexed:       {t_idx:.3f}s")
+    print(f"astar_bidirectional: {t_bi:.3f}s  expansões {sum(exp_bi)}")
+    print(f"Speedup vs astar: {t_ref / t_bi:.2f}x   vs indexed: {t_idx / t_bi:.2f}x   "
+          f"expansões: {sum(exp_uni) / sum(exp_bi):.2f}x menos")
+    wins = sum(1 for u, b in zip(exp_uni, exp_bi) if b < u)
+    print(f"Pares com menos expansões: {wins}/{len(pairs)}")
+
+    print(f"\n{'par':<8} {'astar':>8} {'bidir':>8} {'razão':>7}")
+    ranked = sorted(range(len(pairs)), key=lambda k: exp_bi[k] / max(exp_uni[k], 1))
+    for k in ranked[:N_SHOW] + ranked[-N_SHOW:]:
+        a, b = pairs[k]
+        print(f"{names[a]}->{names[b]:<5} {exp_uni[k]:8} {exp_bi[k]:8} "
+              f"{exp_bi[k] / max(exp_uni[k], 1):7.2f}")
@@ -0,0 +1,59 @@
+# run_bench_ch.py
+# Contraction Hierarchies (ch.ContractionHierarchy) contra o A* exato: pré-processamento,
+# memória, gravação/leitura da hierarquia e latência de consultas entre células quaisquer.
+import os
+import random
+import time
+from map_loader import load_map, terrain_cost
+from astar import astar
+from ch import ContractionHierarchy
+from synthetic_map import make_map
+
+MAP_PATH = "mapa.txt"
+CACHE_DIR = ".cache"
+N_QUERIES = 100
+SYNTHETIC = [(60, 120), (100, 200)]
+
+def _pairs(m, rnd):
+    cg = m["compiled"]
+    free = [(p // cg["cols"], p % cg["cols"]) for p in range(cg["rows"] * cg["cols"])
+            if not cg["blocked"][p]]
+    return [(rnd.choice(free), rnd.choice(free)) for _ in range(N_QUERIES)]
+
+def _bench(name, m, rnd):
+    built = ContractionHierarchy(m)
+    path = os.path.join(CACHE_DIR, f"ch_{built.digest}.bin")   # endereçado pela grade
+    t0 = time.perf_counter()
+    built.save(path)
+    t_save = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    h = ContractionHierarchy.load(path, m)       # consultas na hierarquia lida do disco
+    t_load = time.perf_counter() - t0
+
+    pairs = _pairs(m, rnd)
+    t0 = time.perf_counter()
+    exact = [astar(m, a, b, terrain_cost)[0] for a, b in pairs]
+    t_astar = (time.perf_counter() - t0) / len(pairs)
+    t0 = time.perf_counter()
+    res = [h.query(a, b) for a, b in pairs]
+    t_ch = (time.perf_counter() - t0) / len(pairs)
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        h.query(a, b, unpack=False)
+    t_cost = (time.perf_counter() - t0) / len(pairs)
+
+    ok = all(c == e for (c, _), e in zip(res, exact))
+    print(f"{name:<10} {len(h.cells):7} {built.n_shortcuts:8} {built.build_time:8.1f}"
+          f" {h.nbytes() / 2**20:6.2f} {1000 * t_save:7.0f} {1000 * t_load:6.0f}"
+          f" {1000 * t_astar:10.2f} {1000 * t_ch:8.2f} {1000 * t_cost:9.2f}"
+          f" {t_astar / t_ch:8.1f}x  {ok}")
+
+if __name__ == "__main__":
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    rnd = random.Random(0)
+    print(f"{'mapa':<10} {'nós':>7} {'atalhos':>8} {'pré (s)':>8} {'MiB':>6} {'grava':>7}"
+          f" {'lê(ms)':>6} {'astar(ms)':>10} {'CH(ms)':>8} {'só custo':>9} {'speedup':>9}"
+          f"  custos iguais")
+    _bench("mapa.txt", load_map(MAP_PATH), rnd)
+    for r, c in SYNTHETIC:
+        _bench(f"{r}x{c}", make_map(r, c, seed=1), rnd)
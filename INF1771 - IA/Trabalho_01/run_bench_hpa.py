@@ -0,0 +1,57 @@
+# run_bench_hpa.py
+# HPA* (hpa.HPAStar) contra o A* exato: pré-processamento, tempo por consulta e custo.
+import random
+import time
+from map_loader import load_map, terrain_cost
+from astar import astar, astar_indexed
+from pairwise import get_pois, build_pairwise
+from hpa import HPAStar
+from synthetic_map import tile_map, make_map
+
+MAP_PATH = "mapa.txt"
+CLUSTER_SIZES = [8, 16, 32]
+N_PAIRS = 40
+
+def _pairs(m, rnd):
+    _, coords = get_pois(m)
+    pairs = [(a, b) for a in coords for b in coords if a != b]
+    return rnd.sample(pairs, min(N_PAIRS, len(pairs)))
+
+def _bench(name, m, rnd):
+    pairs = _pairs(m, rnd)
+    t0 = time.perf_counter()
+    exact = [astar_indexed(m, a, b, terrain_cost)[0] for a, b in pairs]
+    t_exact = (time.perf_counter() - t0) / len(pairs)
+    print(f"\n== {name}: {m['compiled']['rows']}x{m['compiled']['cols']}, {len(pairs)} pares;"
+          f" astar_indexed {1000 * t_exact:.1f} ms/consulta ==")
+    print(f"{'cluster':>7} {'pré (s)':>8} {'nós':>6} {'arestas':>8} {'ms/consulta':>12}"
+          f" {'expansões':>10} {'custo médio':>12} {'pior':>6}")
+    for size in CLUSTER_SIZES:
+        h = HPAStar(m, cluster_size=size)
+        t0 = time.perf_counter()
+        ratios, expanded = [], 0
+        for (a, b), e in zip(pairs, exact):
+            c, _ = astar(m, a, b, terrain_cost, engine=h)
+            expanded += h.expanded
+            if e not in (0, float("inf")):
+                ratios.append(c / e)
+        t_q = (time.perf_counter() - t0) / len(pairs)
+        print(f"{size:>7} {h.build_time:8.2f} {h.n_nodes:6} {h.n_edges:8} {1000 * t_q:12.2f}"
+              f" {expanded // len(pairs):10} {sum(ratios) / len(ratios):12.4f} {max(ratios):6.3f}")
+
+if __name__ == "__main__":
+    rnd = random.Random(0)
+    m = load_map(MAP_PATH)
+    _bench("mapa.txt", m, rnd)
+    _bench("mapa.txt 3x3", tile_map(m, 3, 3), rnd)
+    _bench("sintético", make_map(400, 800, seed=1), rnd)
+
+    # matriz inteira pelo motor, contra a exata
+    h = HPAStar(m, cluster_size=16)
+    ref = build_pairwise(m)["dist"]
+    t0 = time.perf_counter()
+    approx = build_pairwise(m, engine=h)["dist"]
+    n = len(ref)
+    worst = max(approx[i][j] / ref[i][j] for i in range(n) for j in range(n) if i != j)
+    print(f"\nbuild_pairwise(engine=HPAStar(16)) em mapa.txt: {time.perf_counter() - t0:.2f}s,"
+          f" pior razão {worst:.3f}")
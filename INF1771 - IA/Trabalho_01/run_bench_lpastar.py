@@ -0,0 +1,69 @@
+# run_bench_lpastar.py
+# Reparo incremental (LPA*) da rota i -> Z contra um astar a frio depois de cada edição.
+import random
+import time
+from map_loader import load_map, compile_grid, terrain_cost
+from astar import astar
+from lpastar import LPAStar
+
+MAP_PATH = "mapa.txt"
+N_EDITS = 30
+REGION_SIZES = [5, 15]
+PAINT = ['A', 'M', 'D', 'R', '.', '#']
+
+def _edits(m, path, rnd):
+    """(tipo, {(r, c): terreno}) alternando células no caminho atual, fora dele e regiões."""
+    rows, cols = len(m["grid"]), len(m["grid"][0])
+    keep = {m["start"], m["goal"]}
+    kinds = [("celula no caminho", 1), ("celula qualquer", 1)]
+    kinds += [(f"regiao {k}x{k}", k) for k in REGION_SIZES]
+    for k in range(N_EDITS * len(kinds)):
+        name, size = kinds[k % len(kinds)]
+        ch = rnd.choice(PAINT)
+        if name == "celula no caminho" and len(path[0]) > 2:
+            r0, c0 = rnd.choice(path[0][1:-1])
+        else:
+            r0, c0 = rnd.randrange(rows - size + 1), rnd.randrange(cols - size + 1)
+        yield name, {(r, c): ch for r in range(r0, r0 + size) for c in range(c0, c0 + size)
+                     if (r, c) not in keep}
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+    rnd = random.Random(0)
+
+    t0 = time.perf_counter()
+    eng = LPAStar(m, m["start"], m["goal"])
+    cost, p = eng.query()
+    print(f"Consulta inicial: custo {int(cost)}  {time.perf_counter() - t0:.3f}s  "
+          f"expansões {eng.expanded}")
+
+    grid = [row[:] for row in m["grid"]]
+    path = [p]
+    res = {}
+    for name, ed in _edits(m, path, rnd):
+        for (r, c), ch in ed.items():
+            grid[r][c] = ch
+        t0 = time.perf_counter()
+        eng.update_cells(ed)
+        cost, path[0] = eng.query()
+        t_inc = time.perf_counter() - t0
+
+        mm = {"grid": grid, "start": m["start"], "goal": m["goal"], "events": {},
+              "compiled": compile_grid(grid, terrain_cost)}
+        t0 = time.perf_counter()
+        ref, _ = astar(mm, m["start"], m["goal"], terrain_cost)
+        t_cold = time.perf_counter() - t0
+
+        r = res.setdefault(name, {"n": 0, "inc": 0.0, "cold": 0.0, "exp": 0, "ok": True})
+        r["n"] += 1
+        r["inc"] += t_inc
+        r["cold"] += t_cold
+        r["exp"] += eng.expanded
+        r["ok"] &= cost == ref
+
+    print(f"\n{'edição':<18} {'LPA* (ms)':>10} {'astar (ms)':>11} {'speedup':>8} "
+          f"{'expansões':>10}  custos iguais")
+    for name, r in res.items():
+        n = r["n"]
+        print(f"{name:<18} {1000 * r['inc'] / n:10.2f} {1000 * r['cold'] / n:11.2f} "
+              f"{r['cold'] / max(r['inc'], 1e-9):8.1f}x {r['exp'] // n:10}  {r['ok']}")
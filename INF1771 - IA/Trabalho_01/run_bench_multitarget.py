@@ -0,0 +1,32 @@
+# run_bench_multitarget.py
+# h_min antigo (Manhattan até cada alvo restante, a cada push) contra o padrão atual
+# (L1 até a caixa dos alvos restantes, O(1), com re-chaveamento preguiçoso).
+import time
+from map_loader import load_map
+from pairwise import build_pairwise, _manhattan
+from synthetic_map import make_map, tile_map
+
+MAP_PATH = "mapa.txt"
+
+def _bench(m, **kw):
+    st = {}
+    t0 = time.perf_counter()
+    data = build_pairwise(m, stats=st, **kw)
+    return data["dist"], time.perf_counter() - t0, st["expanded"]
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+    maps = [
+        ("mapa.txt", m),
+        ("mapa.txt 2x2", tile_map(m, 2, 2)),
+        ("aleatorio 200x400, 16 ev.", make_map(200, 400, 16, seed=1)),
+        ("aleatorio 200x400, 30 ev.", make_map(200, 400, 30, seed=2)),
+    ]
+    for name, md in maps:
+        cg = md["compiled"]
+        print(f"== {name} ({cg['rows']}x{cg['cols']}, {len(md['events'])} eventos)")
+        d_old, t_old, e_old = _bench(md, heuristic=_manhattan)
+        d_new, t_new, e_new = _bench(md)
+        print(f"   h_min antigo: {t_old:7.2f}s  expansões={e_old}")
+        print(f"   caixa (novo): {t_new:7.2f}s  expansões={e_new}")
+        print(f"   speedup: {t_old / t_new:.2f}x   matrizes iguais: {d_old == d_new}")
@@ -0,0 +1,34 @@
+# run_bench_pairwise.py
+# Compara os modos de build_pairwise no mesmo mapa (tempo, expansões, matriz).
+import time
+from map_loader import load_map
+from pairwise import build_pairwise, verify_symmetric
+
+MAP_PATH = "mapa.txt"
+
+MODES = [
+    ("completo", {}),
+    ("simetrico", {"symmetric": True}),
+    ("2 processos", {"workers": 2}),
+    ("4 processos", {"workers": 4}),
+]
+
+def _run(m, kwargs):
+    st = {}
+    t0 = time.perf_counter()
+    data = build_pairwise(m, stats=st, **kwargs)
+    return data, time.perf_counter() - t0, st
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+
+    ref, t_ref, _ = _run(m, {})
+    for name, kwargs in MODES:
+        data, el, st = _run(m, kwargs)
+        same = data["dist"] == ref["dist"]
+        print(f"{name:<12} {el:7.2f}s  expansões={st['expanded']:>8}  "
+              f"speedup={t_ref / el:5.2f}x  matriz igual={same}")
+
+    bad = verify_symmetric(m)
+    print("\nIdentidade dist(a->b) = dist(b->a) - cost(a) + cost(b):",
+          "ok" if not bad else f"{len(bad)} divergências: {bad[:5]}")
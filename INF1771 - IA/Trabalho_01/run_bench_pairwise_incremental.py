@@ -0,0 +1,76 @@
+# run_bench_pairwise_incremental.py
+# Manutenção incremental da matriz (IncrementalPairwise) contra build_pairwise completo.
+import random
+import time
+import config
+from map_loader import load_map, compile_grid, terrain_cost
+from astar import astar
+from pairwise import build_pairwise
+from pairwise_incremental import IncrementalPairwise
+
+MAP_PATH = "mapa.txt"
+N_EDITS = 8
+PAINT = ['A', 'M', 'D', 'R', '.', '#']
+COST_EDITS = [('D', 6), ('R', 4), ('M', 60)]
+
+def _full(grid, m):
+    mm = {"grid": grid, "start": m["start"], "goal": m["goal"], "events": m["events"],
+          "compiled": compile_grid(grid, terrain_cost)}
+    return build_pairwise(mm)["dist"]
+
+def _print(name, sts, t_full, n_entries):
+    n = len(sts)
+    inc = sum(s["time"] for s in sts) / n
+    print(f"{name:<18} {1000 * inc:9.1f} {sum(s['entries'] for s in sts) / n:9.1f}/{n_entries}"
+          f" {sum(s['rows'] for s in sts) / n:6.1f} {sum(s['changed'] for s in sts) / n:8.1f}"
+          f" {t_full / max(inc, 1e-9):8.1f}x")
+
+if __name__ == "__main__":
+    m = load_map(MAP_PATH)
+    rnd = random.Random(0)
+
+    t0 = time.perf_counter()
+    ref = build_pairwise(m)
+    t_full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ip = IncrementalPairwise(m)
+    print(f"build_pairwise: {t_full:.2f}s   IncrementalPairwise (inicial): "
+          f"{time.perf_counter() - t0:.2f}s   matriz igual: {ip.dist == ref['dist']}")
+
+    k = len(ip.labels)
+    n_entries = k * (k - 1)
+    _, path = astar(m, m["start"], m["goal"], terrain_cost)
+    keep = set(ip.coords)
+    rows, cols = len(m["grid"]), len(m["grid"][0])
+    grid = [row[:] for row in m["grid"]]
+
+    def cells(kind):
+        if kind == "celula em i->Z":
+            return [rnd.choice(path[1:-1])]
+        size = 5 if kind == "regiao 5x5" else 1
+        r0, c0 = rnd.randrange(rows - size + 1), rnd.randrange(cols - size + 1)
+        return [(r, c) for r in range(r0, r0 + size) for c in range(c0, c0 + size)]
+
+    print(f"\n{'edição':<18} {'tempo(ms)':>9} {'entradas':>13} {'linhas':>6} {'mudaram':>8}"
+          f" {'speedup':>9}")
+    for kind in ("celula em i->Z", "celula qualquer", "regiao 5x5"):
+        sts = []
+        for _ in range(N_EDITS):
+            ch = rnd.choice(PAINT)
+            ed = {rc: ch for rc in cells(kind) if rc not in keep}
+            for (r, c), x in ed.items():
+                grid[r][c] = x
+            sts.append(ip.update_cells(ed))
+        _print(kind, sts, t_full, n_entries)
+
+    sts = []
+    saved = dict(config.TERRAIN_COST)
+    try:
+        for ch, cost in COST_EDITS:
+            config.TERRAIN_COST[ch] = cost
+            sts.append(ip.reload_costs())
+        _print("TERRAIN_COST", sts, t_full, n_entries)
+        print("\nMatriz final igual a build_pairwise:", ip.dist == _full(grid, m))
+    finally:
+        config.TERRAIN_COST.clear()
+        config.TERRAIN_COST.update(saved)
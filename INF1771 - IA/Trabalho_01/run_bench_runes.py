@@ -0,0 +1,91 @@
+# run_bench_runes.py
+# Tempo da alocação ótima de runas: DP com dicionários x DP em base mista (NumPy).
+import random
+import time
+from config import EVENT_CHARS, RUNES
+from runes import (_dp_for_keep_idx_py, _dp_for_keep_idx, _allocate_uncached, allocate_runes_optimal,
+                   allocation_cache_info)
+from runes_lagrange import allocate_runes_lagrangian
+
+SIZES = [4, 8, 12, 16]
+REPLANS = 100          # ordens aleatórias dos 16 eventos para o LRU
+MODDED = [(10, 10, 50), (12, 12, 80)]   # (runas, usos, eventos) fora do alcance da DP
+POOL_WORKERS = [2, 4]
+
+def _time(fn, *args, **kw):
+    t0 = time.perf_counter()
+    res = fn(*args, **kw)
+    return res, time.perf_counter() - t0
+
+def modded_config(n_runes, uses, n_events, seed=0):
+    """Runas com poder 0.8..2.0 e eventos com dificuldade 50..200, aleatórios."""
+    rnd = random.Random(seed)
+    runes = [{"name": f"R{i}", "power": round(rnd.uniform(0.8, 2.0), 1), "uses": uses}
+             for i in range(n_runes)]
+    difficulty = {f"e{i}": rnd.randint(50, 200) for i in range(n_events)}
+    return runes, difficulty
+
+if __name__ == "__main__":
+    print("== DP por keep_idx: dicionários x base mista ==")
+    print(f"{'eventos':>7} {'dict':>9} {'base mista':>11} {'speedup':>8}  idêntico")
+    for n in SIZES:
+        events = EVENT_CHARS[:n]
+        t_py = t_mr = 0.0
+        same = True
+        for keep_idx in range(len(RUNES)):
+            r_py, dt_py = _time(_dp_for_keep_idx_py, events, keep_idx)
+            r_mr, dt_mr = _time(_dp_for_keep_idx, events, keep_idx)
+            t_py += dt_py
+            t_mr += dt_mr
+            same = same and r_py == r_mr
+        print(f"{n:>7} {t_py:>8.3f}s {t_mr:>10.3f}s {t_py / t_mr:>7.1f}x  {same}")
+
+    print(f"\n== allocate_runes_optimal com LRU por multiconjunto ({REPLANS} ordens) ==")
+    rnd = random.Random(0)
+    events = list(EVENT_CHARS)
+    first, t_first = _time(allocate_runes_optimal, events)
+    t_rest = 0.0
+    for _ in range(REPLANS):
+        rnd.shuffle(events)
+        res, dt = _time(allocate_runes_optimal, events)
+        t_rest += dt
+        assert [d["label"] for d in res["details"]] == events
+        assert res["total_event_time"] == first["total_event_time"]
+    print(f"   1ª chamada: {1000 * t_first:.2f}ms  demais: {1e6 * t_rest / REPLANS:.1f}us/chamada  "
+          f"{allocation_cache_info()}")
+
+    print("\n== relaxação Lagrangiana x DP (config.py) ==")
+    print(f"{'eventos':>7} {'DP':>9} {'lagrange':>9} {'gap p/ DP':>10} {'gap p/ limitante':>17}")
+    for n in SIZES:
+        events = EVENT_CHARS[:n]
+        dp, t_dp = _time(_allocate_uncached, events)   # sem o LRU
+        lg, t_lg = _time(allocate_runes_lagrangian, events)
+        gap_dp = (lg["total_event_time"] - dp["total_event_time"]) / dp["total_event_time"]
+        print(f"{n:>7} {t_dp:>8.3f}s {t_lg:>8.3f}s {100 * gap_dp:>9.4f}% {100 * lg['gap']:>16.4f}%")
+
+    print("\n== relaxação Lagrangiana em configs grandes (sem DP) ==")
+    for n_runes, uses, n_events in MODDED:
+        runes, difficulty = modded_config(n_runes, uses, n_events)
+        st = {}
+        lg, t_lg = _time(allocate_runes_lagrangian, list(difficulty), runes, difficulty, stats=st)
+        states = (uses + 1) ** n_runes
+        pruned = sum(1 for _, _, cost in st["bounds"] if cost is None)
+        print(f"   {n_runes} runas x {uses} usos, {n_events} eventos (DP: {states:.1e} estados): "
+              f"{t_lg:.2f}s  tempo={lg['total_event_time']:.2f}  limitante={lg['lower_bound']:.2f}  "
+              f"gap={100 * lg['gap']:.4f}%  keep_idx sem melhora={pruned}/{n_runes}")
+
+    print("\n== keep_idx com corte por limitante (serial e em processos), 16 eventos ==")
+    events = list(EVENT_CHARS)
+    t0 = time.perf_counter()
+    plain = [_dp_for_keep_idx(events, k) for k in range(len(RUNES))]
+    t_plain = time.perf_counter() - t0
+    ref = min(plain, key=lambda r: r[0])[0]
+    print(f"   sem corte, serial: {t_plain:.3f}s")
+    for workers in [1] + POOL_WORKERS:
+        st = {}
+        res, t_run = _time(_allocate_uncached, events, workers=workers, stats=st)
+        per_keep = "  ".join(f"k{k}: {v['pruned']}/{v['states']} cortados"
+                             for k, v in st["per_keep"].items())
+        print(f"   com corte, {workers} processo(s): {t_run:.3f}s  speedup={t_plain / t_run:.2f}x  "
+              f"igual={res['total_event_time'] == ref}")
+        print(f"      {per_keep}")
@@ -0,0 +1,166 @@
+# run_bench_tsp.py
+# Tempo dos resolvedores de TSP de caminho (i -> eventos -> Z) para vários n de eventos.
+import os
+import random
+import time
+from tsp_held_karp import (_solve_tsp_path_py, solve_tsp_path, solve_tsp_path_numpy,
+                           solve_tsp_path_parallel, solve_tsp_path_memmap, solve_tsp_path_mitm,
+                           DP_MEMORY_LIMIT)
+from tsp_branch_bound import solve_tsp_path_bb
+from tsp_anytime import solve_tsp_path_anytime
+from tsp_session import TSPSession
+
+SIZES = [10, 12, 14, 16, 18, 20]
+BB_SIZES = [25, 30, 35, 40]   # só branch-and-bound
+PY_MAX = 16          # acima disso a versão em Python puro fica lenta demais
+BB_TIME_LIMIT = 120
+ANYTIME_BUDGET = 0.5
+PARALLEL_SIZES = [16, 18, 20]
+MEMMAP_SIZES = [20, 22, 24]  # 24: dp float64 em RAM seria ~3 GB
+MITM_SIZES = [12, 14, 16, 18, 20]
+SESSION_SIZE = 16
+
+def random_instance(n_ev, seed=0):
+    """
+    Pontos aleatórios num grid 137x320; custo de a para b = Manhattan × terreno médio
+    dos dois pontos (5..20), fechado por Floyd-Warshall para virar uma métrica como
+    as matrizes de build_pairwise.
+    """
+    rnd = random.Random(seed)
+    pts = [(rnd.randrange(137), rnd.randrange(320)) for _ in range(n_ev + 2)]
+    terr = [rnd.randint(5, 20) for _ in pts]
+    labels = ['i'] + [f"e{k}" for k in range(n_ev)] + ['Z']
+    n = len(pts)
+    dist = [[(abs(pa[0]-pb[0]) + abs(pa[1]-pb[1])) * (terr[a] + terr[b]) // 2
+             for b, pb in enumerate(pts)] for a, pa in enumerate(pts)]
+    for k in range(n):
+        for a in range(n):
+            dak = dist[a][k]
+            row = dist[a]
+            for b, dkb in enumerate(dist[k]):
+                if dak + dkb < row[b]:
+                    row[b] = dak + dkb
+    return labels, dist
+
+def _restrict(labels, dist, keep):
+    """Submatriz de dist só com os labels de keep (na ordem de keep)."""
+    idx = [labels.index(label) for label in keep]
+    return keep, [[dist[a][b] for b in idx] for a in idx]
+
+def session_edits(labels, dist):
+    """Sequência de edições (nome, labels, dist) sobre uma instância com 1 evento de reserva."""
+    base = labels[:-2] + ['Z']
+    spare = labels[-2]
+    yield "remove evento", *_restrict(labels, dist, [x for x in base if x != base[3]])
+    yield "readiciona", *_restrict(labels, dist, base)
+    l_new, d_new = _restrict(labels, dist, base[:-1] + [spare, 'Z'])
+    yield "evento novo", l_new, d_new
+    moved = [row[:] for row in d_new]
+    for k in range(len(moved)):
+        if k != 5:
+            moved[5][k] = moved[5][k] * 5 // 4
+            moved[k][5] = moved[k][5] * 5 // 4
+    yield "move evento", l_new, moved
+    edge = [row[:] for row in moved]
+    edge[2][4] += 500
+    yield "uma aresta", l_new, edge
+    to_z = [row[:] for row in edge]
+    to_z[4][-1] += 100
+    yield "evento -> Z", l_new, to_z
+
+def _time(fn, labels, dist, **kw):
+    t0 = time.perf_counter()
+    res = fn(labels, dist, **kw)
+    return res, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    print("== DP (Python / NumPy) x branch-and-bound ==")
+    print(f"{'n':>3} {'python':>9} {'numpy':>9} {'b&b':>9} {'nós':>7}  custos iguais")
+    for n in SIZES:
+        labels, dist = random_instance(n, seed=n)
+        r_np, t_np = _time(solve_tsp_path_numpy, labels, dist)
+        st = {}
+        r_bb, t_bb = _time(solve_tsp_path_bb, labels, dist, stats=st)
+        same = r_np[0] == r_bb[0]
+        if n <= PY_MAX:
+            r_py, t_py = _time(_solve_tsp_path_py, labels, dist)
+            same = same and r_py == r_np
+            t_py = f"{t_py:8.2f}s"
+        else:
+            t_py = "-"
+        print(f"{n:>3} {t_py:>9} {t_np:>8.3f}s {t_bb:>8.3f}s {st['nodes']:>7}  {same}")
+
+    print("\n== só branch-and-bound ==")
+    for n in BB_SIZES:
+        labels, dist = random_instance(n, seed=n)
+        st = {}
+        (cost, _), t_bb = _time(solve_tsp_path_bb, labels, dist, stats=st,
+                                time_limit=BB_TIME_LIMIT)
+        status = "ótimo" if st["optimal"] else "limite de tempo"
+        print(f"{n:>3} {t_bb:>8.2f}s  custo={cost}  raiz={st['root_bound']:.0f}  "
+              f"nós={st['nodes']}  ({status})")
+
+    print(f"\n== anytime (2-opt/Or-opt, orçamento {ANYTIME_BUDGET}s) x ótimo ==")
+    for n in [16, 20] + BB_SIZES:
+        labels, dist = random_instance(n, seed=n)
+        best_at = []
+        cost, _ = solve_tsp_path_anytime(labels, dist, ANYTIME_BUDGET,
+                                         on_improve=lambda c, o, t: best_at.append(t))
+        opt, _ = solve_tsp_path_bb(labels, dist, time_limit=BB_TIME_LIMIT)
+        print(f"{n:>3} custo={cost}  ótimo={opt}  gap={100.0 * (cost - opt) / opt:.2f}%  "
+              f"última melhora em {best_at[-1]:.3f}s")
+
+    workers = max(2, os.cpu_count() or 1)
+    print(f"\n== Held-Karp por camadas em {workers} processos x NumPy serial ==")
+    for n in PARALLEL_SIZES:
+        labels, dist = random_instance(n, seed=n)
+        r_np, t_np = _time(solve_tsp_path_numpy, labels, dist)
+        st = {}
+        r_par, t_par = _time(solve_tsp_path_parallel, labels, dist, workers=workers, stats=st)
+        slowest = max(st["layer_times"], key=lambda x: x[2])
+        print(f"{n:>3} serial={t_np:.3f}s  paralelo={t_par:.3f}s  speedup={t_np / t_par:.2f}x  "
+              f"idêntico={r_np == r_par}  camada mais lenta: k={slowest[0]} "
+              f"({slowest[1]} máscaras, {slowest[2]:.3f}s)")
+    print("   tempos por camada (último n):")
+    for k, n_masks, secs in st["layer_times"]:
+        print(f"     k={k:>2}  {n_masks:>7} máscaras  {secs:.4f}s")
+
+    print("\n== Held-Karp em memmap (uint32/uint8 em disco) x branch-and-bound ==")
+    def show_progress(k, n_ev, done, total):
+        if done == total:
+            print(f"\r   camada {k:>2}/{n_ev}", end="", flush=True)
+    for n in MEMMAP_SIZES:
+        labels, dist = random_instance(n, seed=n)
+        st = {}
+        r_mm, t_mm = _time(solve_tsp_path_memmap, labels, dist, progress=show_progress, stats=st)
+        r_bb, _ = _time(solve_tsp_path_bb, labels, dist, time_limit=BB_TIME_LIMIT)
+        print(f"\r{n:>3} memmap={t_mm:.2f}s  disco no pico={st['disk_peak'] / 2**20:.0f} MiB  "
+              f"custo={r_mm[0]}  b&b={r_bb[0]}  iguais={r_mm[0] == r_bb[0]}")
+
+    print("\n== Held-Karp bidirecional (meet-in-the-middle) x NumPy ==")
+    print(f"   (limite: solve_tsp_path com memory_limit={DP_MEMORY_LIMIT // 2**20} MiB)")
+    print(f"{'n':>3} {'numpy':>9} {'mitm':>9} {'limite':>9} {'transições':>12} {'(DP inteira)':>13}"
+          f"  custos iguais")
+    for n in MITM_SIZES:
+        labels, dist = random_instance(n, seed=n)
+        r_np, t_np = _time(solve_tsp_path_numpy, labels, dist)
+        st = {}
+        r_mm, t_mm = _time(solve_tsp_path_mitm, labels, dist, stats=st)
+        r_lim, t_lim = _time(solve_tsp_path, labels, dist, memory_limit=DP_MEMORY_LIMIT)
+        full = n * (n - 1) * 2 ** (n - 2)
+        print(f"{n:>3} {t_np:>8.3f}s {t_mm:>8.3f}s {t_lim:>8.3f}s {st['transitions']:>12} {full:>13}  "
+              f"{r_np[0] == r_mm[0] == r_lim[0]}")
+
+    print(f"\n== sessão incremental (TSPSession) x solve a frio, {SESSION_SIZE} eventos ==")
+    labels, dist = random_instance(SESSION_SIZE + 1, seed=SESSION_SIZE)
+    session = TSPSession(*_restrict(labels, dist, labels[:-2] + ['Z']))
+    session.solve()
+    for name, l_edit, d_edit in session_edits(labels, dist):
+        st = {}
+        t0 = time.perf_counter()
+        session.update(l_edit, d_edit)
+        r_inc = session.solve(stats=st)
+        t_inc = time.perf_counter() - t0
+        r_cold, t_cold = _time(solve_tsp_path_numpy, l_edit, d_edit)
+        print(f"   {name:<14} re-solve={1000 * t_inc:7.2f}ms  frio={1000 * t_cold:7.2f}ms  "
+              f"recalculadas={st['recomputed']:>6}/{st['masks']:<6}  custos iguais={r_inc[0] == r_cold[0]}")
@@ -1,18 +1,14 @@
-from map_loader import load_map, terrain_cost
-from pairwise import build_pairwise
+from pairwise_cache import pairwise_cached, tour_cached
 from tsp_held_karp import solve_tsp_path
 from runes import allocate_runes_greedy
 
 def main():
     MAP_PATH = "mapa.txt"  
-    m = load_map(MAP_PATH)
-
-    # 1) distâncias entre i, 16 eventos, Z
-    data = build_pairwise(m)
-    labels, dist = data["labels"], data["dist"]
+    # 1) distâncias entre i, 16 eventos, Z (do cache quando o mapa/custos não mudaram)
+    data = pairwise_cached(MAP_PATH)
 
     # 2) TSP caminho (start=i, end=Z)
-    travel_cost, order = solve_tsp_path(labels, dist)
+    travel_cost, order = tour_cached(data, solve_tsp_path)
     if travel_cost == float("inf"):
         print("Não existe rota i->eventos->Z no mapa.")
         return
@@ -1,12 +1,10 @@
 # run_pairwise.py
-from map_loader import load_map
-from pairwise import build_pairwise, get_pois
+from pairwise_cache import pairwise_cached
 
 MAP_PATH = "mapa.txt"  
 
 if __name__ == "__main__":
-    m = load_map(MAP_PATH)
-    data = build_pairwise(m)
+    data = pairwise_cached(MAP_PATH)
 
     labels = data["labels"]
     dist = data["dist"]
@@ -1,21 +1,16 @@
 # run_total.py
-from map_loader import load_map, terrain_cost
-from pairwise import build_pairwise
+from pairwise_cache import pairwise_cached, tour_cached
 from tsp_held_karp import solve_tsp_path
 from runes import allocate_runes_greedy
 
 MAP_PATH = "mapa.txt"
 
 if __name__ == "__main__":
-    m = load_map(MAP_PATH)
-
-    # distâncias entre i, eventos, Z
-    data = build_pairwise(m)
-    labels = data["labels"]
-    dist = data["dist"]
+    # distâncias entre i, eventos, Z (do cache quando o mapa/custos não mudaram)
+    data = pairwise_cached(MAP_PATH)
 
     # ordem ótima de viagem (i -> ...eventos... -> Z)
-    travel_cost, order = solve_tsp_path(labels, dist)
+    travel_cost, order = tour_cached(data, solve_tsp_path)
     if travel_cost == float('inf') or not order:
         print("Não existe rota viável que visita todos os eventos e chega a Z.")
         raise SystemExit(0)
@@ -1,16 +1,12 @@
-from map_loader import load_map
-from pairwise import build_pairwise
+from pairwise_cache import pairwise_cached, tour_cached
 from tsp_held_karp import solve_tsp_path
 
 MAP_PATH = "mapa.txt" 
 
 if __name__ == "__main__":
-    m = load_map(MAP_PATH)
-    data = build_pairwise(m)
-    labels = data["labels"]
-    dist = data["dist"]
+    data = pairwise_cached(MAP_PATH)
 
-    cost, order = solve_tsp_path(labels, dist)
+    cost, order = tour_cached(data, solve_tsp_path)
     if cost == float('inf') or not order:
         print("Não existe rota que visite todos os eventos e chegue a Z.")
     else:
@@ -1,5 +1,14 @@
+import multiprocessing as mp
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from config import RUNES, EVENT_DIFFICULTY
 
+try:
+    import numpy as np
+except ImportError:  # sem NumPy: só a DP com dicionários
+    np = None
+
 
 def _subset_usage_and_power():
     n = len(RUNES)
@@ -14,16 +23,31 @@ def _subset_usage_and_power():
         subsets.append((uses, pwr))
     return subsets
 
-_SUBSETS = _subset_usage_and_power()  # cache
+_subsets_cache = {}
+
+def _subsets():
+    """_subset_usage_and_power() das RUNES atuais, guardado sob _runes_key()."""
+    key = _runes_key()
+    subsets = _subsets_cache.get(key)
+    if subsets is None:
+        _subsets_cache.clear()
+        subsets = _subsets_cache[key] = _subset_usage_and_power()
+    return subsets
+
+def _caps(keep_idx):
+    """Usos máximos por runa; a de keep_idx fica com um a menos (a "runa inteira")."""
+    caps = [int(r["uses"]) for r in RUNES]
+    caps[keep_idx] -= 1
+    return caps
 
-def _dp_for_keep_idx(events_labels, keep_idx):
+def _dp_for_keep_idx_py(events_labels, keep_idx):
     """
+    Referência: estados (u0..u4) como tuplas em dicionários.
     keep_idx: índice da runa que ficará "inteira" (cap=4 em vez de 5).
     Retorna (total_time, details, rune_usage) ótimo para esse keep_idx.
     """
     # capacidades por runa
-    caps = [5, 5, 5, 5, 5]
-    caps[keep_idx] = 4  # força a “runa inteira” (<=4 usos)
+    caps = _caps(keep_idx)  # força a “runa inteira” (<=4 usos)
 
     # dificuldades por evento, na ordem dada
     Ds = [float(EVENT_DIFFICULTY[lbl]) for lbl in events_labels]
@@ -31,7 +55,8 @@ def _dp_for_keep_idx(events_labels, keep_idx):
     n_r = len(RUNES)
 
     # DP por estados de uso (u0..u4). Estados: 0..cap
-    start_state = (0, 0, 0, 0, 0)
+    start_state = (0,) * n_r
+    subsets = _subsets()
     dp = {start_state: 0.0}
     parent = {}  
 
@@ -42,7 +67,7 @@ def _dp_for_keep_idx(events_labels, keep_idx):
 
         for state, best_time in dp.items():
             # tenta todos os subconjuntos não vazios
-            for uses_vec, pwr_sum in _SUBSETS:
+            for uses_vec, pwr_sum in subsets:
                 # checa capacidade
                 ok = True
                 new_state = [0]*n_r
@@ -75,11 +100,21 @@ def _dp_for_keep_idx(events_labels, keep_idx):
             best_total = t
             best_state = st
 
-    # reconstrói alocações por evento
-    details = []
+    # reconstrói os subconjuntos usados em cada evento
+    chosen = []
     st = best_state
     for ev_idx in range(n_ev, 0, -1):
         prev_st, uses_vec = parent[(ev_idx, st)]
+        chosen.append(uses_vec)
+        st = prev_st
+    chosen.reverse()
+    return _result(events_labels, Ds, best_total, chosen)
+
+def _result(events_labels, Ds, best_total, chosen):
+    """(total_time, details, rune_usage) a partir do vetor de usos de cada evento."""
+    n_r = len(RUNES)
+    details = []
+    for ev_idx, uses_vec in enumerate(chosen, 1):
         # monta nomes de runas usadas neste evento
         ev_runes = []
         P = 0.0
@@ -96,8 +131,6 @@ def _dp_for_keep_idx(events_labels, keep_idx):
             "time": t,
             "runes": ev_runes
         })
-        st = prev_st
-    details.reverse()
 
     # contagem de usos por runa
     rune_usage = {r["name"]: 0 for r in RUNES}
@@ -107,11 +140,185 @@ def _dp_for_keep_idx(events_labels, keep_idx):
 
     return best_total, details, rune_usage
 
-def allocate_runes_optimal(event_labels_in_order):
+_UNREACHED = np.iinfo(np.int64).max if np is not None else None
+PRUNE_TOL = 1e-9    # folga relativa no corte, para arredondamento não cortar o ótimo
+
+def _remaining_bound(Ds, caps, digits, powers):
+    """
+    lb[e][estado]: limitante inferior admissível (e consistente) do tempo dos eventos
+    Ds[e:] a partir de um estado com e eventos feitos. Com W = poder ainda disponível
+    (sum p_r * usos restantes) e P_full = poder de todas as runas:
+    max(sum D / P_full, (sum sqrt(D))^2 / W) (Cauchy-Schwarz, já que sum P_e <= W);
+    infinito se sobram menos usos do que eventos.
+    """
+    left = caps - digits
+    room = left @ powers
+    uses_left = left.sum(axis=1)
+    p_full = float(powers.sum())
+    D = np.array(Ds)
+    lbs = []
+    for e in range(len(Ds) + 1):
+        rest = D[e:]
+        m = rest.size
+        if m == 0:
+            lbs.append(np.zeros(len(room)))
+            continue
+        with np.errstate(divide="ignore"):
+            lb = np.maximum(rest.sum() / p_full, np.sqrt(rest).sum() ** 2 / room)
+        lbs.append(np.where(uses_left < m, np.inf, lb))
+    return lbs
+
+def _dp_for_keep_idx(events_labels, keep_idx, bound=None, stats=None):
+    """
+    keep_idx: índice da runa que ficará "inteira" (cap=4 em vez de 5).
+    Retorna (total_time, details, rune_usage) ótimo para esse keep_idx.
+    Mesma DP de _dp_for_keep_idx_py, com o estado (u0..u4) codificado em base mista
+    sobre os caps (idx = sum u_i * stride_i): cada camada é um array denso de tempos,
+    cada subconjunto vira um deslocamento fixo de índice e o pai de cada estado é
+    só o índice do subconjunto (por camada, no menor inteiro com sinal em que cabe
+    n_sub: int8 até 127). Os empates são resolvidos como na versão com dicionários:
+    vence a transição achada primeiro, na ordem de inserção dos estados (rank) e
+    depois na ordem de _subsets().
+    bound: número ou função sem argumentos com o melhor total já conhecido (de outro
+    keep_idx); estados cujo tempo parcial + _remaining_bound passa dele são cortados.
+    Se nada sobra, devolve (inf, None, None). O rank continua vindo de todos os
+    estados alcançáveis, então o resultado não cortado é o mesmo da DP completa.
+    stats: dict opcional; recebe "states" (estados gerados) e "pruned" (cortados).
+    """
+    if np is None:
+        return _dp_for_keep_idx_py(events_labels, keep_idx)
+
+    caps = np.array(_caps(keep_idx), dtype=np.int64)
+    Ds = [float(EVENT_DIFFICULTY[lbl]) for lbl in events_labels]
+    subsets = _subsets()
+    n_sub = len(subsets)
+    par_dtype = np.int8 if n_sub <= 127 else np.int16 if n_sub <= 32767 else np.int32
+
+    radix = caps + 1
+    stride = np.concatenate(([1], np.cumprod(radix[:-1])))
+    n_states = int(radix.prod())
+    digits = (np.arange(n_states)[:, None] // stride) % radix
+
+    # por subconjunto: deslocamento do índice e estados de onde ele cabe nos caps
+    deltas, sources = [], []
+    for uses_vec, _ in subsets:
+        used = np.array(uses_vec, dtype=bool)
+        deltas.append(int(stride[used].sum()))
+        sources.append(np.flatnonzero((digits[:, used] < caps[used]).all(axis=1)))
+
+    get_bound = bound if callable(bound) else (lambda: bound)
+    lbs = None
+    n_gen = n_pruned = 0
+
+    dp = np.full(n_states, np.inf)
+    dp[0] = 0.0
+    rank = np.full(n_states, _UNREACHED, dtype=np.int64)   # ordem de inserção
+    rank[0] = 0
+    parents = []
+    for e, D in enumerate(Ds, 1):
+        nxt = np.full(n_states, np.inf)
+        win = np.full(n_states, _UNREACHED, dtype=np.int64)    # chave da transição vencedora
+        first = np.full(n_states, _UNREACHED, dtype=np.int64)  # chave da 1ª transição
+        for s, (_, pwr_sum) in enumerate(subsets):
+            src = sources[s]
+            src = src[rank[src] != _UNREACHED]
+            dst = src + deltas[s]
+            cand = dp[src] + D / pwr_sum
+            key = rank[src] * n_sub + s
+            cur = nxt[dst]
+            better = (cand < cur) | ((cand == cur) & (key < win[dst]))
+            nxt[dst[better]] = cand[better]
+            win[dst[better]] = key[better]
+            first[dst] = np.minimum(first[dst], key)
+        reached = np.flatnonzero(first != _UNREACHED)
+        rank = np.full(n_states, _UNREACHED, dtype=np.int64)
+        rank[reached[np.argsort(first[reached])]] = np.arange(reached.size)
+        parents.append(np.where(win != _UNREACHED, win % n_sub, -1).astype(par_dtype))
+        dp = nxt
+        live = np.isfinite(dp)
+        n_gen += int(live.sum())
+        limit = get_bound()
+        if limit is not None and limit < np.inf:
+            if lbs is None:
+                powers = np.array([float(r["power"]) for r in RUNES])
+                lbs = _remaining_bound(Ds, caps, digits, powers)
+            cut = live & (dp + lbs[e] > limit * (1 + PRUNE_TOL))
+            dp[cut] = np.inf
+            n_pruned += int(cut.sum())
+            if n_pruned and not np.isfinite(dp).any():
+                break
+    if stats is not None:
+        stats["states"] = n_gen
+        stats["pruned"] = n_pruned
+
+    best_total = dp.min()
+    if best_total == np.inf:
+        return float('inf'), None, None
+    st = int(np.where(dp == best_total, rank, _UNREACHED).argmin())
+
+    chosen = []
+    for par in reversed(parents):
+        s = int(par[st])
+        chosen.append(subsets[s][0])
+        st -= deltas[s]
+    chosen.reverse()
+    return _result(events_labels, Ds, float(best_total), chosen)
+
+def _keep_run(events_labels, keep_idx, bound):
+    st = {"states": 0, "pruned": 0}
+    t0 = time.perf_counter()
+    total, details, usage = _dp_for_keep_idx(events_labels, keep_idx, bound=bound, stats=st)
+    st["time"] = time.perf_counter() - t0
+    return total, details, usage, st
+
+_ALLOC_WORKER = {}
+
+def _alloc_worker_init(shared_bound):
+    _ALLOC_WORKER["bound"] = shared_bound
+
+def _alloc_worker_keep(task):
+    """Um keep_idx num processo: lê e atualiza o melhor total compartilhado."""
+    events_labels, keep_idx = task
+    shared = _ALLOC_WORKER["bound"]
+    res = _keep_run(events_labels, keep_idx, lambda: shared.value)
+    with shared.get_lock():
+        if res[0] < shared.value:
+            shared.value = res[0]
+    return res
+
+def _allocate_uncached(event_labels_in_order, workers=1, stats=None):
+    """
+    Melhor das DPs por keep_idx. Roda primeiro o keep_idx da runa mais fraca (em geral
+    o ótimo) e usa o total dele como corte nas demais, que com workers > 1 vão para
+    um ProcessPoolExecutor e compartilham o melhor total (mp.Value).
+    stats: dict opcional; recebe "per_keep" = {keep_idx: {"states", "pruned", "time"}}
+    e "wall_time".
+    """
+    t0 = time.perf_counter()
+    labels = list(event_labels_in_order)
+    n_r = len(RUNES)
+    seed = min(range(n_r), key=lambda i: (float(RUNES[i]["power"]), i))
+    runs = {seed: _keep_run(labels, seed, None)}
+    rest = [k for k in range(n_r) if k != seed]
+    if workers <= 1 or not rest:
+        incumbent = [runs[seed][0]]
+        for keep_idx in rest:
+            runs[keep_idx] = _keep_run(labels, keep_idx, lambda: incumbent[0])
+            incumbent[0] = min(incumbent[0], runs[keep_idx][0])
+    else:
+        shared = mp.Value('d', runs[seed][0])
+        with ProcessPoolExecutor(max_workers=workers, initializer=_alloc_worker_init,
+                                 initargs=(shared,)) as ex:
+            for keep_idx, res in zip(rest, ex.map(_alloc_worker_keep, [(labels, k) for k in rest])):
+                runs[keep_idx] = res
+    if stats is not None:
+        stats["per_keep"] = {k: runs[k][3] for k in range(n_r)}
+        stats["wall_time"] = time.perf_counter() - t0
+
     best = None
     best_payload = None
-    for keep_idx in range(len(RUNES)):
-        total, details, usage = _dp_for_keep_idx(event_labels_in_order, keep_idx)
+    for keep_idx in range(n_r):
+        total, details, usage, _ = runs[keep_idx]
         if (best is None) or (total < best):
             best = total
             best_payload = (details, usage)
@@ -126,4 +333,57 @@ def allocate_runes_optimal(event_labels_in_order):
         "keep_rule_ok": keep_rule_ok,
     }
 
+# O objetivo (soma de D / poder) não depende da ordem dos eventos: o resultado é
+# calculado uma vez para o multiconjunto de dificuldades (eventos ordenados por D)
+# e guardado num LRU; cada chamada só remapeia os detalhes para a ordem pedida.
+ALLOC_CACHE_SIZE = 128
+_alloc_cache = OrderedDict()
+_alloc_stats = {"hits": 0, "misses": 0}
+
+def _runes_key():
+    return tuple((r["name"], float(r["power"]), int(r["uses"])) for r in RUNES)
+
+def allocate_runes_optimal(event_labels_in_order, workers=1, stats=None):
+    """
+    Alocação ótima das runas para os eventos na ordem dada (ver _allocate_uncached).
+    Memoizada pelo multiconjunto de dificuldades + RUNES: o total é o mesmo da DP
+    na ordem pedida; em empates, a escolha de runas por evento é a da ordem canônica.
+    stats: dict opcional; recebe "cache_hit" e, quando calcula, os de _allocate_uncached.
+    """
+    labels = list(event_labels_in_order)
+    Ds = [float(EVENT_DIFFICULTY[lbl]) for lbl in labels]
+    canon = sorted(range(len(labels)), key=lambda i: (Ds[i], i))
+    key = (tuple(Ds[i] for i in canon), _runes_key())
+
+    cached = _alloc_cache.get(key)
+    if stats is not None:
+        stats["cache_hit"] = cached is not None
+    if cached is None:
+        _alloc_stats["misses"] += 1
+        cached = _allocate_uncached([labels[i] for i in canon], workers=workers, stats=stats)
+        _alloc_cache[key] = cached
+        if len(_alloc_cache) > ALLOC_CACHE_SIZE:
+            _alloc_cache.popitem(last=False)
+    else:
+        _alloc_stats["hits"] += 1
+        _alloc_cache.move_to_end(key)
+
+    # detalhe na posição p da ordem canônica pertence ao evento labels[canon[p]]
+    details = [None] * len(labels)
+    for p, i in enumerate(canon):
+        d = dict(cached["details"][p])
+        d["label"] = labels[i]
+        d["runes"] = list(d["runes"])
+        details[i] = d
+    return {
+        "total_event_time": cached["total_event_time"],
+        "details": details,
+        "rune_usage": dict(cached["rune_usage"]),
+        "keep_rule_ok": cached["keep_rule_ok"],
+    }
+
+def allocation_cache_info():
+    """Acertos, faltas e tamanho atual do LRU de allocate_runes_optimal."""
+    return dict(_alloc_stats, size=len(_alloc_cache))
+
 allocate_runes_greedy = allocate_runes_optimal
@@ -0,0 +1,233 @@
+# runes_lagrange.py
+# Alocação de runas escalável (muitas runas, muitos usos, muitos eventos): relaxação
+# Lagrangiana das capacidades com subgradiente + reparo guloso e busca local.
+import numpy as np
+from config import RUNES, EVENT_DIFFICULTY, KEEP_ONE_RUNE_INTACT
+
+LAGRANGE_MAX_RUNES = 16   # o subproblema enumera os 2^n - 1 subconjuntos de runas
+LAGRANGE_ITERS = 300
+REPAIR_EVERY = 25         # a cada quantas iterações a solução relaxada vira primal
+STALL_ITERS = 20          # sem melhora no limitante: passo cai pela metade
+EPS = 1e-9
+
+
+def _subsets(powers):
+    """Matriz de uso (2^n - 1, n) e poder de cada subconjunto não vazio."""
+    n_r = len(powers)
+    masks = np.arange(1, 1 << n_r)
+    U = ((masks[:, None] >> np.arange(n_r)) & 1).astype(bool)
+    # soma na ordem das runas, como em runes._subset_usage_and_power
+    P = np.zeros(len(masks))
+    for i, p in enumerate(powers):
+        P = P + U[:, i] * float(p)
+    return U, P
+
+
+def _power(powers, used):
+    p = 0.0
+    for i in used:
+        p += float(powers[i])
+    return p
+
+
+def _repair(Ds, powers, caps, choice):
+    """
+    Torna viável uma escolha (lista de conjuntos de runas por evento): tira usos das
+    runas acima do cap onde a perda é menor (trocando por uma runa com folga quando
+    o evento ficaria sem runa) e depois melhora por busca local.
+    Devolve None se não há como dar ao menos uma runa para cada evento.
+    """
+    n_r = len(powers)
+    if sum(caps) < len(Ds):
+        return None
+    sets = [set(s) for s in choice]
+    usage = [0] * n_r
+    for s in sets:
+        for r in s:
+            usage[r] += 1
+    t = lambda e, s: Ds[e] / _power(powers, s) if s else float('inf')
+
+    for r in range(n_r):
+        while usage[r] > caps[r]:
+            best = None
+            for e, s in enumerate(sets):
+                if r not in s:
+                    continue
+                if len(s) > 1:
+                    loss = t(e, s - {r}) - t(e, s)
+                    cand = (loss, e, None)
+                else:
+                    spare = [q for q in range(n_r) if usage[q] < caps[q]]
+                    if not spare:
+                        continue
+                    q = min(spare, key=lambda q: t(e, {q}))
+                    cand = (t(e, {q}) - t(e, s), e, q)
+                if best is None or cand[0] < best[0]:
+                    best = cand
+            if best is None:
+                return None
+            _, e, q = best
+            sets[e].discard(r)
+            usage[r] -= 1
+            if q is not None:
+                sets[e].add(q)
+                usage[q] += 1
+    _local_search(Ds, powers, caps, sets, usage)
+    return sets
+
+
+def _local_search(Ds, powers, caps, sets, usage):
+    """
+    Melhora até não haver movimento bom: (1) uso livre vai para o evento que mais
+    ganha com ele, (2) um uso passa de um evento para outro, (3) dois eventos trocam
+    uma runa entre si. Todos os movimentos preservam a viabilidade.
+    """
+    n_r = len(powers)
+    t = lambda e, s: Ds[e] / _power(powers, s)
+    improved = True
+    while improved:
+        improved = False
+        for r in range(n_r):
+            while usage[r] < caps[r]:
+                free = [e for e, s in enumerate(sets) if r not in s]
+                if not free:
+                    break
+                e = max(free, key=lambda e: t(e, sets[e]) - t(e, sets[e] | {r}))
+                sets[e].add(r)
+                usage[r] += 1
+                improved = True
+        for r in range(n_r):
+            for a, sa in enumerate(sets):
+                if r not in sa or len(sa) == 1:
+                    continue
+                loss = t(a, sa - {r}) - t(a, sa)
+                best_gain, best_b = EPS, None
+                for b, sb in enumerate(sets):
+                    if r in sb:
+                        continue
+                    gain = t(b, sb) - t(b, sb | {r}) - loss
+                    if gain > best_gain:
+                        best_gain, best_b = gain, b
+                if best_b is not None:
+                    sa.discard(r)
+                    sets[best_b].add(r)
+                    improved = True
+        for a in range(len(sets)):
+            for b in range(a + 1, len(sets)):
+                sa, sb = sets[a], sets[b]
+                base = t(a, sa) + t(b, sb)
+                for r in sa - sb:
+                    for q in sb - sa:
+                        na, nb = (sa - {r}) | {q}, (sb - {q}) | {r}
+                        if t(a, na) + t(b, nb) < base - EPS:
+                            sets[a], sets[b] = sa, sb = na, nb
+                            base = t(a, sa) + t(b, sb)
+                            improved = True
+                            break
+                    else:
+                        continue
+                    break
+
+
+def _lagrangian(Ds, powers, caps, U, P, iters, ub=float('inf')):
+    """
+    Subgradiente nos multiplicadores lambda_r >= 0 das capacidades. Para lambda
+    fixo cada evento escolhe sozinho o subconjunto de menor D/P + sum lambda;
+    L(lambda) = sum desses mínimos - lambda . caps é limitante inferior.
+    Devolve (limitante, melhor solução viável ou None, custo dela).
+    """
+    D = np.array(Ds)[:, None]
+    caps_v = np.array(caps, dtype=np.float64)
+    lam = np.zeros(len(powers))
+    base = D / P[None, :]
+    best_lb, best_sets, best_ub = -float('inf'), None, ub
+    theta, stall = 2.0, 0
+    for it in range(iters):
+        reduced = base + (U @ lam)[None, :]
+        pick = reduced.argmin(axis=1)
+        lb = float(reduced[np.arange(len(Ds)), pick].sum() - lam @ caps_v)
+        if lb > best_lb + EPS:
+            best_lb, stall = lb, 0
+        else:
+            stall += 1
+            if stall >= STALL_ITERS:
+                theta, stall = theta / 2, 0
+        if it % REPAIR_EVERY == 0 or it == iters - 1:
+            sets = _repair(Ds, powers, caps, [np.flatnonzero(U[s]) for s in pick])
+            if sets is not None:
+                cost = sum(Ds[e] / _power(powers, s) for e, s in enumerate(sets))
+                if cost < best_ub:
+                    best_sets, best_ub = sets, cost
+        if best_ub - best_lb <= EPS * max(1.0, abs(best_ub)):
+            break
+        g = U[pick].sum(axis=0) - caps_v
+        norm = float(g @ g)
+        if norm == 0:
+            break
+        gap = best_ub - lb if best_ub < float('inf') else abs(lb) + 1.0
+        lam = np.maximum(0.0, lam + theta * gap / norm * g)
+    return best_lb, best_sets, best_ub
+
+
+def allocate_runes_lagrangian(event_labels_in_order, runes=None, difficulty=None,
+                              keep_one_intact=None, iters=LAGRANGE_ITERS, stats=None):
+    """
+    Mesmo modelo de runes.allocate_runes_optimal (cada evento usa um subconjunto não
+    vazio das runas, cada runa no máximo 'uses' vezes, uma delas com um uso a menos
+    se keep_one_intact), sem a DP sobre o produto dos caps: relaxação Lagrangiana
+    por runa "mantida" + reparo/busca local, com as que não podem bater a melhor
+    solução (limitante >= incumbente) descartadas.
+    runes/difficulty/keep_one_intact: padrão RUNES, EVENT_DIFFICULTY, KEEP_ONE_RUNE_INTACT.
+    Retorna o dict de allocate_runes_optimal + "lower_bound" e "gap" (relativo).
+    stats: dict opcional; recebe "bounds" = [(keep_idx, limitante, custo), ...]
+    (custo None quando o keep_idx não melhorou a incumbente).
+    """
+    runes = RUNES if runes is None else runes
+    difficulty = EVENT_DIFFICULTY if difficulty is None else difficulty
+    keep_one_intact = KEEP_ONE_RUNE_INTACT if keep_one_intact is None else keep_one_intact
+    if len(runes) > LAGRANGE_MAX_RUNES:
+        raise ValueError(f"no máximo {LAGRANGE_MAX_RUNES} runas (subconjuntos enumerados)")
+    labels = list(event_labels_in_order)
+    Ds = [float(difficulty[lbl]) for lbl in labels]
+    powers = [float(r["power"]) for r in runes]
+    uses = [int(r["uses"]) for r in runes]
+    U, P = _subsets(powers)
+
+    keeps = range(len(runes)) if keep_one_intact else [None]
+    bounds = []
+    best_cost, best_sets, lower = float('inf'), None, float('inf')
+    for keep_idx in keeps:
+        caps = uses[:]
+        if keep_idx is not None:
+            caps[keep_idx] -= 1
+        lb, sets, cost = _lagrangian(Ds, powers, caps, U, P, iters, ub=best_cost)
+        bounds.append((keep_idx, lb, cost if sets is not None else None))
+        lower = min(lower, lb)
+        if sets is not None and cost < best_cost:
+            best_cost, best_sets = cost, sets
+    if stats is not None:
+        stats["bounds"] = bounds
+    if best_sets is None:
+        raise ValueError("não há usos de runa suficientes para todos os eventos")
+
+    details = []
+    rune_usage = {r["name"]: 0 for r in runes}
+    for e, s in enumerate(best_sets):
+        used = sorted(s)
+        p = _power(powers, used)
+        names = [runes[i]["name"] for i in used]
+        for name in names:
+            rune_usage[name] += 1
+        details.append({"label": labels[e], "D": Ds[e], "P": p, "time": Ds[e] / p,
+                        "runes": names})
+    total = sum(d["time"] for d in details)
+    lower = min(lower, total)
+    return {
+        "total_event_time": total,
+        "details": details,
+        "rune_usage": rune_usage,
+        "keep_rule_ok": (not keep_one_intact
+                         or any(rune_usage[r["name"]] < u for r, u in zip(runes, uses))),
+        "lower_bound": lower,
+        "gap": (total - lower) / total if total > 0 else 0.0,
+    }
@@ -0,0 +1,98 @@
+# stages.py
+# Grafo preguiçoso de etapas (mapa -> grade compilada -> distâncias -> rota -> runas -> custo):
+# cada etapa é memoizada, cronometrada e só recalculada quando alguma entrada muda.
+import os
+import time
+
+
+def file_input(path_func):
+    """Entrada "arquivo": (caminho, mtime_ns, tamanho); path_func() dá o caminho atual."""
+    def fingerprint():
+        path = path_func()
+        try:
+            st = os.stat(path)
+        except OSError:
+            return (path, None, None)
+        return (path, st.st_mtime_ns, st.st_size)
+    return fingerprint
+
+def value_input(obj_func):
+    """Entrada "valor": repr do objeto (dicts ordenados), então edições in-place contam."""
+    def fingerprint():
+        obj = obj_func()
+        if isinstance(obj, dict):
+            return repr(sorted(obj.items(), key=lambda kv: repr(kv[0])))
+        return repr(obj)
+    return fingerprint
+
+
+class Stage:
+    """Uma etapa: compute(*valores das deps), com a chave das entradas do último cálculo."""
+
+    def __init__(self, name, compute, deps, inputs):
+        self.name = name
+        self.compute = compute
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.key = None          # (impressões das entradas, versões das deps)
+        self.value = None
+        self.version = 0         # sobe a cada recálculo; invalida as etapas seguintes
+        self.runs = 0
+        self.hits = 0
+        self.elapsed = 0.0       # tempo do último cálculo
+        self.total_time = 0.0
+
+
+class StageGraph:
+    """
+    DAG de etapas avaliado sob demanda. get(name) avalia as dependências primeiro,
+    compara a impressão das entradas + versões das dependências com a do último
+    cálculo e só chama compute quando algo mudou; nada é calculado duas vezes
+    para as mesmas entradas.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name, compute, deps=(), inputs=()):
+        """deps: nomes de etapas já adicionadas; inputs: funções sem argumento (file_input...)."""
+        for d in deps:
+            if d not in self.stages:
+                raise ValueError(f"etapa {name!r} depende de {d!r}, que não existe")
+        self.stages[name] = Stage(name, compute, deps, inputs)
+
+    def get(self, name):
+        st = self.stages[name]
+        values = [self.get(d) for d in st.deps]
+        key = (tuple(f() for f in st.inputs),
+               tuple(self.stages[d].version for d in st.deps))
+        if st.key is not None and key == st.key:
+            st.hits += 1
+            return st.value
+        t0 = time.perf_counter()
+        st.value = st.compute(*values)
+        st.elapsed = time.perf_counter() - t0
+        st.total_time += st.elapsed
+        st.key = key
+        st.version += 1
+        st.runs += 1
+        return st.value
+
+    def fresh(self, name):
+        """True se get(name) devolveria o valor memoizado sem recalcular nada."""
+        st = self.stages[name]
+        if st.key is None or not all(self.fresh(d) for d in st.deps):
+            return False
+        key = (tuple(f() for f in st.inputs),
+               tuple(self.stages[d].version for d in st.deps))
+        return key == st.key
+
+    def invalidate(self, name):
+        """Força o recálculo de name (e, pelas versões, das etapas que dependem dela)."""
+        self.stages[name].key = None
+
+    def report(self):
+        """Lista de {"stage", "runs", "hits", "last", "total"} na ordem em que foram adicionadas."""
+        return [{"stage": st.name, "runs": st.runs, "hits": st.hits,
+                 "last": st.elapsed, "total": st.total_time}
+                for st in self.stages.values()]
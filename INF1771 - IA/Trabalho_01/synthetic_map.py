@@ -0,0 +1,68 @@
+# synthetic_map.py
+# Mapas sintéticos no mesmo formato de load_map, para benchmarks maiores que mapa.txt.
+import random
+from config import EVENT_CHARS
+from map_loader import compile_grid, terrain_cost
+
+# proporções parecidas com as de mapa.txt (água dominante, montanhas, pouco terreno livre)
+TERRAIN_MIX = [('A', 0.55), ('M', 0.15), ('.', 0.08), ('D', 0.06),
+               ('F', 0.05), ('R', 0.05), ('N', 0.04), ('L', 0.02)]
+
+def event_labels(n_events):
+    """Rótulos dos eventos: EVENT_CHARS primeiro, depois 'X17', 'X18', ..."""
+    labels = list(EVENT_CHARS[:n_events])
+    labels += [f"X{k+1}" for k in range(len(labels), n_events)]
+    return labels
+
+def _finish(grid, start, goal, events):
+    """Marca os POIs na grade (rótulos fora de EVENT_CHARS ficam como '.') e compila."""
+    grid[start[0]][start[1]] = 'i'
+    grid[goal[0]][goal[1]] = 'Z'
+    for lbl, (r, c) in events.items():
+        grid[r][c] = lbl if lbl in EVENT_CHARS else '.'
+    mapdata = {"grid": grid, "start": start, "goal": goal, "events": events}
+    mapdata["compiled"] = compile_grid(grid, terrain_cost)
+    return mapdata
+
+def make_map(rows, cols, n_events=16, seed=0, block=8, noise=0.1):
+    """
+    Mapa aleatório rows x cols: um terreno sorteado (TERRAIN_MIX) por bloco block x block,
+    com uma fração noise de células trocadas; i, Z e n_events eventos em células distintas.
+    """
+    rnd = random.Random(seed)
+    kinds = [k for k, _ in TERRAIN_MIX]
+    weights = [w for _, w in TERRAIN_MIX]
+    br, bc = (rows + block - 1) // block, (cols + block - 1) // block
+    blocks = [rnd.choices(kinds, weights, k=bc) for _ in range(br)]
+    grid = []
+    for r in range(rows):
+        brow = blocks[r // block]
+        row = [brow[c // block] for c in range(cols)]
+        for c in range(cols):
+            if rnd.random() < noise:
+                row[c] = rnd.choices(kinds, weights)[0]
+        grid.append(row)
+
+    labels = event_labels(n_events)
+    cells = rnd.sample(range(rows * cols), n_events + 2)
+    cells = [divmod(p, cols) for p in cells]
+    events = dict(zip(labels, cells[2:]))
+    return _finish(grid, cells[0], cells[1], events)
+
+def tile_map(mapdata, fr, fc):
+    """
+    Repete a grade de mapdata fr x fc vezes; os POIs são apagados das cópias e
+    reposicionados proporcionalmente (r*fr, c*fc), ficando espalhados como no original.
+    """
+    base = [['.' if ch in EVENT_CHARS or ch in ('i', 'Z') else ch for ch in row]
+            for row in mapdata["grid"]]
+    grid = []
+    for _ in range(fr):
+        for row in base:
+            grid.append(row * fc)
+
+    def scale(cell):
+        return (cell[0] * fr, cell[1] * fc)
+
+    events = {lbl: scale(cell) for lbl, cell in mapdata["events"].items()}
+    return _finish(grid, scale(mapdata["start"]), scale(mapdata["goal"]), events)
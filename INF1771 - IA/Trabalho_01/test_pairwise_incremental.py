@@ -0,0 +1,43 @@
+# test_pairwise_incremental.py
+# IncrementalPairwise tem de manter a mesma matriz que build_pairwise do zero.
+import random
+import config
+from map_loader import compile_grid, terrain_cost
+from pairwise import build_pairwise
+from pairwise_incremental import IncrementalPairwise
+from synthetic_map import make_map
+
+PAINT = ['A', 'M', 'D', 'R', '.', '#']
+
+def _full(grid, m):
+    mm = {"grid": grid, "start": m["start"], "goal": m["goal"], "events": m["events"],
+          "compiled": compile_grid(grid, terrain_cost)}
+    return build_pairwise(mm)["dist"]
+
+def test_initial_matrix_matches_build_pairwise():
+    m = make_map(40, 60, n_events=6, seed=2)
+    assert IncrementalPairwise(m).dist == build_pairwise(m)["dist"]
+
+def test_cell_edits_match_build_pairwise():
+    m = make_map(40, 60, n_events=6, seed=3)
+    ip = IncrementalPairwise(m)
+    keep = set(ip.coords)
+    grid = [row[:] for row in m["grid"]]
+    rnd = random.Random(0)
+    for size in (1, 1, 3, 5, 1, 3):
+        r0, c0 = rnd.randrange(40 - size + 1), rnd.randrange(60 - size + 1)
+        ch = rnd.choice(PAINT)
+        ed = {(r, c): ch for r in range(r0, r0 + size) for c in range(c0, c0 + size)
+              if (r, c) not in keep}
+        for (r, c), x in ed.items():
+            grid[r][c] = x
+        ip.update_cells(ed)
+        assert ip.dist == _full(grid, m)
+
+def test_terrain_cost_edits_match_build_pairwise(monkeypatch):
+    m = make_map(40, 60, n_events=6, seed=4)
+    ip = IncrementalPairwise(m)
+    for ch, cost in [('D', 6), ('R', 4), ('M', 60), ('A', 2)]:
+        monkeypatch.setitem(config.TERRAIN_COST, ch, cost)
+        ip.reload_costs()
+        assert ip.dist == _full(m["grid"], m)
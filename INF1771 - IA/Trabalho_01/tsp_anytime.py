@@ -0,0 +1,132 @@
+# tsp_anytime.py
+# Resolvedor "anytime" do caminho i -> eventos -> Z: vizinho mais próximo + 2-opt / Or-opt
+# com orçamento de tempo, reportando cada incumbente melhor.
+import random
+import time
+from tsp_branch_bound import nearest_neighbour_order
+
+INF = float('inf')
+OR_OPT_MAX = 3      # tamanho máximo do segmento movido pelo Or-opt
+
+
+def _prefix(seq, D):
+    """Somas prefixas das arestas no sentido do caminho (P) e no sentido inverso (Q)."""
+    P = [0] * len(seq)
+    Q = [0] * len(seq)
+    for t in range(1, len(seq)):
+        a, b = seq[t-1], seq[t]
+        P[t] = P[t-1] + D[a][b]
+        Q[t] = Q[t-1] + D[b][a]
+    return P, Q
+
+
+def _two_opt(seq, D):
+    """
+    Primeiro 2-opt que melhora: inverte seq[i..j] (extremos fixos). Com d assimétrico
+    o trecho invertido custa Q[j]-Q[i] em vez de P[j]-P[i]. Retorna delta (<0) ou 0.
+    """
+    n = len(seq)
+    P, Q = _prefix(seq, D)
+    for i in range(1, n - 2):
+        a, si = seq[i-1], seq[i]
+        Da = D[a]
+        base_i = Da[si]
+        for j in range(i + 1, n - 1):
+            sj, b = seq[j], seq[j+1]
+            delta = (Da[sj] + D[si][b] + (Q[j] - Q[i])) - (base_i + D[sj][b] + (P[j] - P[i]))
+            if delta < 0:
+                seq[i:j+1] = seq[i:j+1][::-1]
+                return delta
+    return 0
+
+
+def _or_opt(seq, D):
+    """Primeiro Or-opt que melhora: move um trecho de 1..OR_OPT_MAX eventos para outra posição."""
+    n = len(seq)
+    for L in range(1, OR_OPT_MAX + 1):
+        for i in range(1, n - L):
+            a, s0, sL, b = seq[i-1], seq[i], seq[i+L-1], seq[i+L]
+            gain = D[a][b] - D[a][s0] - D[sL][b]
+            for k in range(0, n - 1):
+                if i - 1 <= k <= i + L - 1:
+                    continue
+                c, d = seq[k], seq[k+1]
+                delta = gain + D[c][s0] + D[sL][d] - D[c][d]
+                if delta < 0:
+                    seg = seq[i:i+L]
+                    del seq[i:i+L]
+                    pos = k + 1 if k < i else k + 1 - L
+                    seq[pos:pos] = seg
+                    return delta
+    return 0
+
+
+def _perturb(seq, rnd):
+    """Double-bridge no miolo do caminho (mantém i e Z nas pontas)."""
+    inner = seq[1:-1]
+    if len(inner) < 4:
+        rnd.shuffle(inner)
+    else:
+        p1, p2, p3 = sorted(rnd.sample(range(1, len(inner)), 3))
+        inner = inner[:p1] + inner[p2:p3] + inner[p1:p2] + inner[p3:]
+    seq[1:-1] = inner
+
+
+def _path_cost(seq, D):
+    return sum(D[a][b] for a, b in zip(seq, seq[1:]))
+
+
+def solve_tsp_path_anytime(labels, dist, time_budget=1.0, on_improve=None, seed=0, stats=None):
+    """
+    labels/dist como em tsp_held_karp.solve_tsp_path; retorna (custo, ordem_labels),
+    a melhor rota encontrada até estourar time_budget (s) - não necessariamente ótima.
+    Começa no vizinho mais próximo a partir de i, aplica 2-opt e Or-opt (avaliação
+    por delta) até um ótimo local e então perturba (double-bridge) e repete.
+    on_improve(custo, ordem_labels, segundos): chamado a cada incumbente melhor.
+    stats: dict opcional com "moves", "restarts", "elapsed".
+    """
+    t0 = time.perf_counter()
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev <= 0:
+        return 0, labels[:]
+    Z = n_total - 1
+    D = [list(row) for row in dist]
+    rnd = random.Random(seed)
+
+    cost, order = nearest_neighbour_order(D, n_ev)
+    if cost == INF:
+        return INF, []
+    seq = [0] + order + [Z]
+    best_cost, best_seq = cost, seq[:]
+
+    def report():
+        if on_improve is not None:
+            on_improve(int(best_cost), [labels[k] for k in best_seq], time.perf_counter() - t0)
+
+    report()
+    moves = restarts = 0
+    deadline = t0 + time_budget
+    while time.perf_counter() < deadline:
+        delta = _two_opt(seq, D) or _or_opt(seq, D)
+        if delta < 0:
+            cost += delta
+            moves += 1
+            continue
+        # ótimo local
+        if cost < best_cost:
+            best_cost, best_seq = cost, seq[:]
+            report()
+        if n_ev < 3:
+            break           # vizinhança já é exaustiva
+        seq = best_seq[:]
+        _perturb(seq, rnd)
+        cost = _path_cost(seq, D)
+        restarts += 1
+
+    if cost < best_cost:
+        best_cost, best_seq = cost, seq[:]
+        report()
+    if stats is not None:
+        stats.update(moves=moves, restarts=restarts, elapsed=time.perf_counter() - t0)
+    return int(best_cost), [labels[k] for k in best_seq]
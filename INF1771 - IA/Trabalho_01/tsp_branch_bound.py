@@ -0,0 +1,171 @@
+# tsp_branch_bound.py
+# Branch-and-bound exato para o caminho i -> (todos os eventos) -> Z, para muitos eventos.
+import heapq
+import math
+import time
+
+INF = float('inf')
+
+ROOT_ITERS = 60     # subgradiente na raiz (potenciais pi compartilhados)
+NODE_ITERS = 4      # refinamento por nó, partindo dos pi da raiz
+
+
+def nearest_neighbour_order(D, n_ev):
+    """Incumbente inicial: do i sempre ao evento mais próximo ainda não visitado, depois Z."""
+    Z = n_ev + 1
+    order, cost, last = [], 0, 0
+    left = set(range(1, n_ev + 1))
+    while left:
+        nxt = min(left, key=lambda k: (D[last][k], k))
+        if D[last][nxt] == INF:
+            return INF, []
+        cost += D[last][nxt]
+        order.append(nxt)
+        left.remove(nxt)
+        last = nxt
+    if D[last][Z] == INF:
+        return INF, []
+    return cost + D[last][Z], order
+
+
+def _tree_bound(W, nodes, first, last, pi, iters, ub):
+    """
+    Limite inferior "1-tree" de Held-Karp para um caminho Hamiltoniano de first a last
+    passando por todos os nodes (W simétrico). Um caminho é uma árvore geradora com
+    grau 1 nos extremos e 2 no resto, então, para quaisquer potenciais pi,
+        L(pi) = MST(W[a][b] + pi[a] + pi[b]) - sum(alvo[v] * pi[v]) <= custo do caminho.
+    Faz iters passos de subgradiente (grau - alvo) a partir de pi; retorna o melhor L
+    e os pi finais (dict). Sai cedo se L >= ub (nó podado) ou se a árvore já é um caminho.
+    """
+    pi = {v: pi.get(v, 0.0) for v in nodes}
+    target = {v: 2 for v in nodes}
+    target[first] = 1
+    target[last] = 1
+    best = -INF
+    step = 1.0
+    m = len(nodes)
+    for _ in range(max(1, iters)):
+        # Prim O(m^2) com pesos modificados
+        key = {v: W[nodes[0]][v] + pi[nodes[0]] + pi[v] for v in nodes[1:]}
+        link = {v: nodes[0] for v in nodes[1:]}
+        deg = {v: 0 for v in nodes}
+        total = 0.0
+        while key:
+            v = min(key, key=key.get)
+            kv = key.pop(v)
+            if kv == INF:
+                return INF, pi
+            total += kv
+            deg[v] += 1
+            deg[link[v]] += 1
+            pv = pi[v]
+            Wv = W[v]
+            for u in key:
+                w = Wv[u] + pv + pi[u]
+                if w < key[u]:
+                    key[u] = w
+                    link[u] = v
+        L = total - sum(target[v] * pi[v] for v in nodes)
+        if L > best:
+            best = L
+        if best >= ub:
+            break
+        sub = {v: deg[v] - target[v] for v in nodes}
+        norm = sum(s * s for s in sub.values())
+        if norm == 0:
+            break   # a árvore já é um caminho first..last: limite justo
+        gap = (ub - L) if ub != INF else max(1.0, abs(L)) * 0.1
+        t = step * gap / norm
+        for v in nodes:
+            pi[v] += t * sub[v]
+        step *= 0.9
+        if m <= 2:
+            break
+    return best, pi
+
+
+def solve_tsp_path_bb(labels, dist, time_limit=None, stats=None):
+    """
+    labels/dist como em tsp_held_karp.solve_tsp_path; retorna (custo, ordem_labels) ótimo.
+    Best-first pelo limite inferior: g do prefixo + limite 1-tree (Held-Karp, com
+    subgradiente) sobre {último} ∪ restantes ∪ {Z}, em pesos min(d[a][b], d[b][a]).
+    Incumbente inicial por vizinho mais próximo; poda por dominância em (visitados, último).
+    time_limit (s): se estourar, devolve o melhor incumbente (stats["optimal"] = False).
+    stats: dict opcional com "nodes", "pruned", "root_bound", "optimal".
+    """
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev <= 0:
+        return 0, labels[:]
+    Z = n_total - 1
+    for k in range(1, n_ev + 1):
+        if dist[0][k] == INF or dist[k][Z] == INF:
+            return INF, []
+
+    D = [list(row) for row in dist]
+    integral = all(d == INF or d == int(d) for row in D for d in row)
+    W = [[min(D[a][b], D[b][a]) for b in range(n_total)] for a in range(n_total)]
+    t_end = None if time_limit is None else time.perf_counter() + time_limit
+
+    ub, best_order = nearest_neighbour_order(D, n_ev)
+
+    events = list(range(1, n_ev + 1))
+    root_lb, root_pi = _tree_bound(W, [0] + events + [Z], 0, Z, {}, ROOT_ITERS, ub)
+
+    full = (1 << n_ev) - 1
+    seen = {}            # (mask, último) -> menor g já enfileirado
+    counter = 0
+    heap = [(root_lb, 0, counter, 0, 0, 0, None)]   # (lb, -prof., desempate, g, último, mask, cadeia)
+    nodes = pruned = 0
+    optimal = True
+
+    while heap:
+        lb, negdepth, _, g, last, mask, chain = heapq.heappop(heap)
+        if lb >= ub:
+            break                    # best-first: o resto da fila também não melhora
+        if t_end is not None and time.perf_counter() > t_end:
+            optimal = False
+            break
+        nodes += 1
+        for r in events:
+            bit = 1 << (r - 1)
+            if mask & bit or D[last][r] == INF:
+                continue
+            cg = g + D[last][r]
+            cmask = mask | bit
+            if cmask == full:
+                total = cg + D[r][Z]
+                if total < ub:
+                    ub = total
+                    best_order = _unchain((r, chain))
+                continue
+            key = (cmask, r)
+            if seen.get(key, INF) <= cg:
+                pruned += 1
+                continue
+            seen[key] = cg
+            rest = [e for e in events if not cmask & (1 << (e - 1))]
+            bound, _ = _tree_bound(W, [r] + rest + [Z], r, Z, root_pi, NODE_ITERS, ub - cg)
+            if integral and bound != INF:
+                bound = math.ceil(bound - 1e-6)   # custos inteiros: o limite também
+            clb = cg + bound
+            if clb >= ub:
+                pruned += 1
+                continue
+            counter += 1
+            heapq.heappush(heap, (clb, negdepth - 1, counter, cg, r, cmask, (r, chain)))
+
+    if stats is not None:
+        stats.update(nodes=nodes, pruned=pruned, root_bound=root_lb, optimal=optimal)
+    if ub == INF:
+        return INF, []
+    return int(ub), ['i'] + [labels[k] for k in best_order] + ['Z']
+
+
+def _unchain(chain):
+    out = []
+    while chain is not None:
+        out.append(chain[0])
+        chain = chain[1]
+    out.reverse()
+    return out
@@ -1,9 +1,52 @@
-def solve_tsp_path(labels, dist):
+import math
+import os
+import shutil
+import tempfile
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+try:
+    import numpy as np
+except ImportError:  # sem NumPy: só a versão em Python puro
+    np = None
+
+
+# acima disso a DP (2^n estados) dá lugar ao branch-and-bound de tsp_branch_bound
+DP_MAX_EVENTS = 18
+# memory_limit sugerido para solve_tsp_path: a DP densa passa disso em n = 18
+# (~53 MiB) e aí entra o meet-in-the-middle (~34 MiB), ~1.5-2x mais lento
+DP_MEMORY_LIMIT = 48 * 2**20
+
+
+def solve_tsp_path(labels, dist, memory_limit=None):
     """
     labels: ['i', <16 eventos ordenados>, 'Z']
     dist: matriz NxN com custos inteiros (dist[i][j])
     Retorna (custo_total, ordem_labels)
+    Usa a DP vetorizada em NumPy quando disponível (mesmo resultado, inclusive
+    nos empates); senão, _solve_tsp_path_py. Com mais de DP_MAX_EVENTS eventos,
+    usa o branch-and-bound exato (tsp_branch_bound.solve_tsp_path_bb).
+    memory_limit: bytes para as tabelas da DP (ex.: DP_MEMORY_LIMIT); None = sem
+    limite. Se a DP densa não cabe, usa solve_tsp_path_mitm (mais lenta, mesmo custo
+    ótimo, mas nos empates a ordem pode ser outra) e, se nem essa cabe, o
+    branch-and-bound.
     """
+    n_ev = len(labels) - 2
+    if n_ev <= DP_MAX_EVENTS:
+        if np is None:
+            return _solve_tsp_path_py(labels, dist)
+        if memory_limit is None or _dense_dp_bytes(n_ev) <= memory_limit:
+            return solve_tsp_path_numpy(labels, dist)
+        if _mitm_bytes(n_ev) <= memory_limit:
+            return solve_tsp_path_mitm(labels, dist)
+    from tsp_branch_bound import solve_tsp_path_bb
+    return solve_tsp_path_bb(labels, dist)
+
+
+def _solve_tsp_path_py(labels, dist):
+    """Held-Karp em Python puro (referência): dp/parent como listas de listas."""
     n_total = len(labels)          
     n_ev = n_total - 2             
     if n_ev <= 0:
@@ -74,3 +117,531 @@ def solve_tsp_path(labels, dist):
 
     ordem_labels = ['i'] + [labels[idx] for idx in ordem_idx] + ['Z']
     return int(best_cost), ordem_labels
+
+
+def _popcount_layers(n_ev):
+    """Máscaras 0..2^n-1 agrupadas por popcount (cada grupo em ordem crescente)."""
+    masks = np.arange(1 << n_ev, dtype=np.int64)
+    pc = np.zeros(1 << n_ev, dtype=np.int8)
+    for b in range(n_ev):
+        pc += ((masks >> b) & 1).astype(np.int8)
+    order = np.argsort(pc, kind="stable")
+    bounds = np.searchsorted(pc[order], np.arange(n_ev + 2))
+    return [order[bounds[k]:bounds[k+1]] for k in range(n_ev + 1)]
+
+
+def _hk_layer(dp, parent, layer, D_ev, j_range):
+    """
+    Relaxa dp[mask][j] = min_k dp[mask ^ 1<<j][k] + D_ev[k][j] para as máscaras de
+    um popcount (todas dependem só da camada anterior). argmin devolve o 1º índice
+    mínimo, o mesmo desempate do laço k crescente com '<' estrito.
+    """
+    for j in j_range:
+        bit = 1 << j
+        sel = layer[(layer & bit) != 0]
+        if sel.size == 0:
+            continue
+        cand = dp[sel ^ bit] + D_ev[:, j]
+        best_k = cand.argmin(axis=1)
+        best = cand[np.arange(sel.size), best_k]
+        dp[sel, j] = best
+        parent[sel, j] = np.where(np.isinf(best), -1, best_k)
+
+
+def _hk_close(labels, dist, dp, parent, n_ev):
+    """Fecha em Z a partir de dp[full] e reconstrói a ordem pelos pais."""
+    Z = n_ev + 1
+    full = (1 << n_ev) - 1
+    to_z = np.array([dist[1+j][Z] for j in range(n_ev)], dtype=np.float64)
+    closing = dp[full] + to_z
+    last_ev = int(closing.argmin())
+    best_cost = float(closing[last_ev])
+    if best_cost == float('inf'):
+        return float('inf'), []
+
+    ordem_idx = []
+    mask = full
+    j = last_ev
+    while j != -1:
+        ordem_idx.append(1 + j)
+        pj = int(parent[mask, j])
+        mask ^= (1 << j)
+        j = pj
+    ordem_idx.reverse()
+    return int(best_cost), ['i'] + [labels[idx] for idx in ordem_idx] + ['Z']
+
+
+def solve_tsp_path_numpy(labels, dist):
+    """
+    Held-Karp vetorizado: dp é um array (2^n, n) float64 e parent (2^n, n) int8;
+    cada camada de popcount é relaxada em lote (_hk_layer). Mesmo contrato e
+    mesmo resultado de _solve_tsp_path_py.
+    """
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev <= 0:
+        return 0, labels[:]
+    if n_ev > 127:
+        raise ValueError("parent int8 suporta no máximo 127 eventos")
+
+    if _infeasible(dist, n_ev):
+        return float('inf'), []
+
+    D_ev = _event_matrix(dist, n_ev)
+    size = 1 << n_ev
+    dp = np.full((size, n_ev), np.inf)
+    parent = np.full((size, n_ev), -1, dtype=np.int8)
+    _hk_base(dp, dist, n_ev)
+
+    layers = _popcount_layers(n_ev)
+    for k in range(2, n_ev + 1):
+        _hk_layer(dp, parent, layers[k], D_ev, range(n_ev))
+
+    return _hk_close(labels, dist, dp, parent, n_ev)
+
+
+def _event_matrix(dist, n_ev):
+    return np.array([[dist[1+k][1+j] for j in range(n_ev)] for k in range(n_ev)],
+                    dtype=np.float64)
+
+
+def _hk_base(dp, dist, n_ev):
+    for j in range(n_ev):
+        dp[1 << j, j] = dist[0][1+j]      # i -> evento j
+
+
+def _infeasible(dist, n_ev):
+    Z = n_ev + 1
+    return any(dist[0][1+k] == float('inf') or dist[1+k][Z] == float('inf')
+               for k in range(n_ev))
+
+
+# --- Held-Karp paralelo por camadas -------------------------------------------
+# dp/parent ficam em memória compartilhada; cada worker relaxa uma fatia fixa das
+# máscaras de cada camada e os workers esperam numa barreira antes da camada
+# seguinte, que só lê a anterior; o de rank 0 avisa o pai por um pipe ao fim de
+# cada camada. O pai espera nesse pipe e nos sentinels dos workers, então um worker
+# que sai com erro (exceção, sinal, OOM) é visto na hora.
+
+
+def _hk_layer_worker(dp_name, parent_name, n_ev, D_ev, rank, workers, barrier, done):
+    dp_shm = par_shm = None
+    try:
+        dp_shm = shared_memory.SharedMemory(name=dp_name)
+        par_shm = shared_memory.SharedMemory(name=parent_name)
+        size = 1 << n_ev
+        dp = np.ndarray((size, n_ev), dtype=np.float64, buffer=dp_shm.buf)
+        parent = np.ndarray((size, n_ev), dtype=np.int8, buffer=par_shm.buf)
+        layers = _popcount_layers(n_ev)
+        for k in range(2, n_ev + 1):
+            mine = np.array_split(layers[k], workers)[rank]
+            _hk_layer(dp, parent, mine, D_ev, range(n_ev))
+            barrier.wait()
+            if rank == 0:
+                done.send(k)
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        dp = parent = None
+        for shm in (dp_shm, par_shm):
+            if shm is not None:
+                shm.close()
+
+
+def solve_tsp_path_parallel(labels, dist, workers=None, stats=None, layer_timeout=None):
+    """
+    Held-Karp com cada camada de popcount dividida entre workers processos.
+    Cada elemento de dp/parent é calculado pelas mesmas operações da versão serial,
+    então o resultado é idêntico bit a bit a solve_tsp_path_numpy.
+    stats: dict opcional; recebe "layer_times" = [(k, n_máscaras, segundos), ...].
+    Um worker que sai com código != 0 dá RuntimeError assim que sai.
+    layer_timeout: limite opcional, em segundos, de espera por camada (None = sem
+    limite); estourou: RuntimeError.
+    """
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev <= 0:
+        return 0, labels[:]
+    if n_ev > 127:
+        raise ValueError("parent int8 suporta no máximo 127 eventos")
+    if _infeasible(dist, n_ev):
+        return float('inf'), []
+    workers = workers or mp.cpu_count()
+
+    size = 1 << n_ev
+    D_ev = _event_matrix(dist, n_ev)
+    dp_shm = shared_memory.SharedMemory(create=True, size=size * n_ev * 8)
+    par_shm = shared_memory.SharedMemory(create=True, size=size * n_ev)
+    done_recv, done_send = mp.Pipe(duplex=False)
+    procs = []
+    try:
+        dp = np.ndarray((size, n_ev), dtype=np.float64, buffer=dp_shm.buf)
+        parent = np.ndarray((size, n_ev), dtype=np.int8, buffer=par_shm.buf)
+        dp.fill(np.inf)
+        parent.fill(-1)
+        _hk_base(dp, dist, n_ev)
+        layer_sizes = [len(layer) for layer in _popcount_layers(n_ev)]
+
+        barrier = mp.Barrier(workers)
+        procs = [mp.Process(target=_hk_layer_worker,
+                            args=(dp_shm.name, par_shm.name, n_ev, D_ev, rank, workers,
+                                  barrier, done_send))
+                 for rank in range(workers)]
+        for p in procs:
+            p.start()
+        running = {p.sentinel: p for p in procs}
+        layer_times = []
+        t_prev = time.perf_counter()
+        k = 2
+        while k <= n_ev:
+            ready = wait([done_recv, *running], layer_timeout)
+            if not ready:
+                raise RuntimeError(f"camada {k} do Held-Karp paralelo passou de "
+                                   f"{layer_timeout}s")
+            for s in ready:
+                if s is not done_recv:
+                    p = running.pop(s)
+                    p.join()                   # já saiu; join lê o exitcode
+                    if p.exitcode != 0:
+                        raise RuntimeError(f"um worker do Held-Karp paralelo saiu com "
+                                           f"código {p.exitcode} na camada {k}")
+            if done_recv in ready:
+                done_recv.recv()
+                t_now = time.perf_counter()
+                layer_times.append((k, layer_sizes[k], t_now - t_prev))
+                t_prev = t_now
+                k += 1
+        for p in procs:
+            p.join()
+        if stats is not None:
+            stats["layer_times"] = layer_times
+
+        result = _hk_close(labels, dist, dp, parent, n_ev)
+        dp = parent = None
+        return result
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        done_recv.close()
+        done_send.close()
+        dp = parent = None
+        dp_shm.close()
+        dp_shm.unlink()
+        par_shm.close()
+        par_shm.unlink()
+
+
+# --- Held-Karp fora da memória (memmap) ---------------------------------------
+# Cada camada de popcount k vira um bloco contíguo em disco: dp_k (C(n,k), n) uint32
+# e parent_k (C(n,k), n) uint8, com as máscaras em ordem crescente. Nessa ordem
+# (colexicográfica) a posição de uma máscara na camada é o seu rank combinatório
+# sum C(b_i, i), então a camada k é escrita em sequência e só lê a camada k-1;
+# os dp das camadas antigas são apagados e só os parent ficam até o fim.
+
+MEMMAP_INF = np.iinfo(np.uint32).max if np is not None else None
+MEMMAP_NO_PARENT = 255
+MEMMAP_CHUNK = 1 << 14          # máscaras por bloco lido/escrito de uma vez
+
+
+def _binomials(n):
+    """C[b, i] = comb(b, i) para b em 0..n, i em 0..n+1 (int64)."""
+    C = np.zeros((n + 1, n + 2), dtype=np.int64)
+    C[:, 0] = 1
+    for b in range(1, n + 1):
+        C[b, 1:] = C[b-1, 1:] + C[b-1, :-1]
+    return C
+
+
+def _unrank_bits(C, n, k, start, stop):
+    """
+    Bits (em ordem crescente, shape (m, k)) das máscaras de popcount k com rank em
+    [start, stop): inverso de _mask_rank.
+    """
+    r = np.arange(start, stop, dtype=np.int64)
+    bits = np.empty((r.size, k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        b = np.searchsorted(C[:n, i], r, side="right") - 1
+        bits[:, i-1] = b
+        r -= C[b, i]
+    return bits
+
+
+def _mask_rank(C, mask):
+    rank, i = 0, 0
+    b = 0
+    while mask:
+        if mask & 1:
+            i += 1
+            rank += int(C[b, i])
+        mask >>= 1
+        b += 1
+    return rank
+
+
+def _hk_ranked_block(dp_prev, C, D_ev, k, start, stop, inf, dtype):
+    """
+    Linhas [start, stop) da camada k a partir da camada k-1 em ordem de rank.
+    Só os k-1 bits da máscara anterior são candidatos, em ordem crescente, então o
+    desempate é o mesmo de _hk_layer. Estados sem caminho ficam com inf e parent
+    MEMMAP_NO_PARENT.
+    """
+    n_ev = D_ev.shape[0]
+    P = _unrank_bits(C, n_ev, k, start, stop)
+    rows = np.arange(stop - start)
+    # rank de mask ^ (1 << P[:, t]): os bits abaixo de t mantêm a posição i,
+    # os de cima caem para i-1
+    i = np.arange(1, k + 1)
+    same = C[P, i]
+    shifted = C[P, i - 1]
+    prev = (np.cumsum(same, axis=1) - same) + (shifted.sum(axis=1)[:, None]
+                                                - np.cumsum(shifted, axis=1))
+    # índices achatados: np.take em 1-D é bem mais rápido que indexação 2-D
+    flat_prev = dp_prev.reshape(-1)
+    flat_D = np.ascontiguousarray(D_ev).reshape(-1)
+    out = np.full((stop - start) * n_ev, inf, dtype=dtype)
+    out_par = np.full((stop - start) * n_ev, MEMMAP_NO_PARENT, dtype=np.uint8)
+    keep = np.ones(k, dtype=bool)
+    for t in range(k):
+        keep[t] = False
+        ks = P[:, keep]
+        keep[t] = True
+        j = P[:, t]
+        cand = (np.take(flat_prev, prev[:, t, None] * n_ev + ks).astype(D_ev.dtype, copy=False)
+                + np.take(flat_D, ks * n_ev + j[:, None]))
+        best_i = cand.argmin(axis=1)
+        best = cand[rows, best_i]
+        ok = best < inf
+        dst = (rows * n_ev + j)[ok]
+        out[dst] = best[ok]
+        out_par[dst] = ks[rows, best_i][ok]
+    return out.reshape(-1, n_ev), out_par.reshape(-1, n_ev)
+
+
+def _integral_matrix(dist, n_ev):
+    """dist como int64 com infinito -> MEMMAP_INF; ValueError se não couber em uint32."""
+    D = np.array(dist, dtype=np.float64)
+    finite = np.isfinite(D)
+    if not np.all(D[finite] == np.floor(D[finite])):
+        raise ValueError("o Held-Karp em memmap exige custos inteiros")
+    if finite.any() and D[finite].max() * (n_ev + 1) >= MEMMAP_INF:
+        raise ValueError("custos grandes demais para dp uint32")
+    out = np.full(D.shape, MEMMAP_INF, dtype=np.int64)
+    out[finite] = D[finite].astype(np.int64)
+    return out
+
+
+def solve_tsp_path_memmap(labels, dist, workdir=None, chunk=MEMMAP_CHUNK,
+                          progress=None, stats=None):
+    """
+    Held-Karp com dp/parent em numpy.memmap (uint32/uint8), camada a camada.
+    Mesmo contrato e mesmo resultado (inclusive nos empates) de solve_tsp_path_numpy,
+    mas a memória usada é a de um bloco de chunk máscaras; o disco guarda no pico
+    dois dp de camada e todos os parent (~2^n * n bytes). Custos precisam ser inteiros.
+    workdir: diretório onde criar a pasta temporária (padrão: o do sistema).
+    progress(k, n_ev, feitas, total): chamado após cada bloco da camada k.
+    stats: dict opcional; recebe "layer_times" = [(k, n_máscaras, segundos), ...]
+    e "disk_peak" (bytes).
+    """
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev <= 0:
+        return 0, labels[:]
+    if n_ev >= MEMMAP_NO_PARENT:
+        raise ValueError("parent uint8 suporta no máximo 254 eventos")
+    if _infeasible(dist, n_ev):
+        return float('inf'), []
+
+    D = _integral_matrix(dist, n_ev)
+    D_ev = D[1:n_ev+1, 1:n_ev+1]
+    C = _binomials(n_ev)
+    tmp = tempfile.mkdtemp(prefix="hk_memmap_", dir=workdir)
+    dp_path = lambda k: os.path.join(tmp, f"dp_{k}.u32")
+    par_path = lambda k: os.path.join(tmp, f"parent_{k}.u8")
+    parents = {}
+    layer_times = []
+    disk = disk_peak = 0
+    try:
+        # camada 1: máscara 1<<j tem rank j
+        dp_prev = np.memmap(dp_path(1), dtype=np.uint32, mode="w+", shape=(n_ev, n_ev))
+        dp_prev[:] = MEMMAP_INF
+        dp_prev[np.arange(n_ev), np.arange(n_ev)] = D[0, 1:n_ev+1]
+        dp_prev.flush()
+        disk = disk_peak = dp_prev.nbytes
+
+        for k in range(2, n_ev + 1):
+            t0 = time.perf_counter()
+            total = int(C[n_ev, k])
+            dp_cur = np.memmap(dp_path(k), dtype=np.uint32, mode="w+", shape=(total, n_ev))
+            par_cur = np.memmap(par_path(k), dtype=np.uint8, mode="w+", shape=(total, n_ev))
+            disk += dp_cur.nbytes + par_cur.nbytes
+            disk_peak = max(disk_peak, disk)
+            for start in range(0, total, chunk):
+                stop = min(start + chunk, total)
+                out, out_par = _hk_ranked_block(dp_prev, C, D_ev, k, start, stop,
+                                                MEMMAP_INF, np.uint32)
+                dp_cur[start:stop] = out
+                par_cur[start:stop] = out_par
+                if progress is not None:
+                    progress(k, n_ev, stop, total)
+            dp_cur.flush()
+            par_cur.flush()
+            parents[k] = par_cur
+            disk -= dp_prev.nbytes
+            del dp_prev
+            os.remove(dp_path(k - 1))
+            dp_prev = dp_cur
+            layer_times.append((k, total, time.perf_counter() - t0))
+
+        if stats is not None:
+            stats["layer_times"] = layer_times
+            stats["disk_peak"] = disk_peak
+
+        # fechar em Z: a camada n tem só a máscara cheia (rank 0)
+        closing = dp_prev[0].astype(np.int64) + D[1:n_ev+1, n_ev+1]
+        last_ev = int(closing.argmin())
+        best_cost = int(closing[last_ev])
+        del dp_prev
+        if best_cost >= MEMMAP_INF:
+            return float('inf'), []
+
+        ordem_idx = []
+        mask = (1 << n_ev) - 1
+        j = last_ev
+        for k in range(n_ev, 0, -1):
+            ordem_idx.append(1 + j)
+            pj = -1 if k == 1 else int(parents[k][_mask_rank(C, mask), j])
+            mask ^= (1 << j)
+            j = pj
+        ordem_idx.reverse()
+        return best_cost, ['i'] + [labels[idx] for idx in ordem_idx] + ['Z']
+    finally:
+        parents.clear()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# --- Held-Karp bidirecional (meet-in-the-middle) ------------------------------
+# Com os extremos fixos em i e Z, o caminho ótimo se parte depois do h-ésimo evento:
+# F[S][j] = melhor i -> S terminando em j (|S| = h) e B[T][k] = melhor k -> T -> Z
+# começando em k (|T| = n - h). B segue a mesma recorrência de F com D transposta.
+# As duas tabelas só vão até a metade, onde as máscaras têm poucos bits (menos
+# candidatos por estado), e se juntam por T = complemento de S:
+# custo = F[S][j] + D[j][k] + B[T][k].
+
+MITM_CHUNK = 1 << 12          # máscaras por bloco (temporários cabem no cache)
+
+
+def _dense_dp_bytes(n_ev):
+    """
+    Pico de solve_tsp_path_numpy: dp float64 + parent int8 por (máscara, evento) e
+    ~48 bytes por máscara de camadas e temporários (medido com tracemalloc).
+    """
+    return (1 << max(n_ev, 0)) * (9 * n_ev + 48)
+
+
+def _mitm_bytes(n_ev):
+    """
+    Pico de solve_tsp_path_mitm, no fim da tabela de trás: parents uint8 de todas as
+    camadas dos dois lados, dp float64 da última camada da frente, atrás a
+    penúltima camada mais os blocos e a concatenação da última, e os temporários
+    de um bloco (~5 arrays (MITM_CHUNK, n) de 8 bytes; a junção cria menos).
+    """
+    h = n_ev // 2
+    parents = sum(math.comb(n_ev, k) for k in range(2, h + 1))
+    parents += sum(math.comb(n_ev, k) for k in range(2, n_ev - h + 1))
+    rows = math.comb(n_ev, h) + math.comb(n_ev, n_ev - h - 1) + 2 * math.comb(n_ev, n_ev - h)
+    return n_ev * parents + 8 * n_ev * rows + 40 * MITM_CHUNK * n_ev
+
+
+def _ranks(C, masks, n):
+    """Rank de cada máscara dentro da sua camada de popcount (vetorizado)."""
+    rank = np.zeros(masks.size, dtype=np.int64)
+    pos = np.zeros(masks.size, dtype=np.int64)
+    for b in range(n):
+        bit = (masks >> b) & 1
+        pos += bit
+        rank += C[b, pos] * bit
+    return rank
+
+
+def _half_tables(C, D_ev, base, depth):
+    """Camadas 1..depth de uma direção: (dp da camada depth, parents[k] por camada)."""
+    n_ev = D_ev.shape[0]
+    dp = np.full((n_ev, n_ev), np.inf)
+    dp[np.arange(n_ev), np.arange(n_ev)] = base
+    parents = [None, None]
+    for k in range(2, depth + 1):
+        total = int(C[n_ev, k])
+        blocks = [_hk_ranked_block(dp, C, D_ev, k, start, min(start + MITM_CHUNK, total),
+                                   np.inf, np.float64)
+                  for start in range(0, total, MITM_CHUNK)]
+        dp = np.concatenate([b[0] for b in blocks])
+        parents.append(np.concatenate([b[1] for b in blocks]))
+    return dp, parents
+
+
+def _walk(C, parents, mask, j):
+    """Eventos da cadeia que termina (ou começa, na tabela de trás) em j."""
+    seq = []
+    for k in range(bin(mask).count("1"), 0, -1):
+        seq.append(j)
+        if k > 1:
+            pj = int(parents[k][_mask_rank(C, mask), j])
+        mask ^= (1 << j)
+        if k > 1:
+            j = pj
+    return seq
+
+
+def solve_tsp_path_mitm(labels, dist, stats=None):
+    """
+    Held-Karp bidirecional: camadas 1..n/2 a partir de i, 1..n-n/2 a partir de Z,
+    e junção pelos subconjuntos complementares. Mesmo contrato e mesmo custo ótimo
+    de solve_tsp_path_numpy; em empates a ordem devolvida pode ser outra ótima.
+    Só guarda o dp da última camada de cada lado (parents uint8 de todas).
+    stats: dict opcional; recebe "forward_layers", "backward_layers" e
+    "transitions" (candidatos k -> j avaliados; a DP inteira avalia n(n-1)2^(n-2)).
+    """
+    n_total = len(labels)
+    n_ev = n_total - 2
+    if n_ev < 2:
+        return solve_tsp_path_numpy(labels, dist)
+    if n_ev >= MEMMAP_NO_PARENT:
+        raise ValueError("parent uint8 suporta no máximo 254 eventos")
+    if _infeasible(dist, n_ev):
+        return float('inf'), []
+
+    D = np.array(dist, dtype=np.float64)
+    D_ev = D[1:n_ev+1, 1:n_ev+1]
+    C = _binomials(n_ev)
+    h = n_ev // 2
+    fwd, fwd_par = _half_tables(C, D_ev, D[0, 1:n_ev+1], h)
+    bwd, bwd_par = _half_tables(C, np.ascontiguousarray(D_ev.T), D[1:n_ev+1, n_ev+1], n_ev - h)
+    if stats is not None:
+        stats["forward_layers"] = h
+        stats["backward_layers"] = n_ev - h
+        per_layer = C[n_ev, :n_ev+1] * np.arange(n_ev + 1) * np.arange(-1, n_ev)
+        stats["transitions"] = int(per_layer[2:h+1].sum() + per_layer[2:n_ev-h+1].sum())
+
+    full = (1 << n_ev) - 1
+    best_cost, best = float('inf'), None
+    total = int(C[n_ev, h])
+    step = max(1, MITM_CHUNK // n_ev)     # a junção cria (step, n, n) por bloco
+    for start in range(0, total, step):
+        stop = min(start + step, total)
+        masks = (np.int64(1) << _unrank_bits(C, n_ev, h, start, stop)).sum(axis=1)
+        comp = _ranks(C, full ^ masks, n_ev)
+        cost = fwd[start:stop, :, None] + D_ev[None, :, :] + bwd[comp][:, None, :]
+        idx = int(cost.argmin())
+        if cost.flat[idx] < best_cost:
+            best_cost = float(cost.flat[idx])
+            m, rest = divmod(idx, n_ev * n_ev)
+            best = (int(masks[m]), *divmod(rest, n_ev))
+    if best is None:
+        return float('inf'), []
+
+    S, j, k = best
+    ordem_idx = [1 + e for e in _walk(C, fwd_par, S, j)[::-1] + _walk(C, bwd_par, full ^ S, k)]
+    return int(best_cost), ['i'] + [labels[idx] for idx in ordem_idx] + ['Z']
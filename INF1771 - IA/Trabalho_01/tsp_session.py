@@ -0,0 +1,169 @@
+# tsp_session.py
+# Sessão de TSP com estado: mantém as tabelas do Held-Karp entre edições (eventos
+# adicionados, removidos ou com distâncias novas) e recalcula só os estados invalidados.
+try:
+    import numpy as np
+except ImportError:  # sem NumPy: TSPSession fica indisponível (main usa tour_cached)
+    np = None
+from tsp_held_karp import DP_MAX_EVENTS, _popcount_layers, _hk_layer
+
+INF = float('inf')
+
+
+class TSPSession:
+    """
+    Held-Karp incremental para o caminho i -> eventos -> Z.
+
+    Cada evento ocupa um "slot" (bit) fixo; dp[mask][j] só depende das distâncias
+    entre i e os eventos de mask, então uma edição invalida apenas as máscaras que
+    contêm os eventos tocados:
+      - evento removido: nada é recalculado (a resposta sai de dp[ativos]);
+      - evento novo: só as máscaras com o bit novo;
+      - aresta a -> b alterada: as máscaras com a e b; i -> a: as máscaras com a;
+      - a -> Z: nada (o fechamento é refeito a cada solve).
+    As máscaras inválidas são recalculadas preguiçosamente em solve(), e só as
+    contidas no conjunto ativo. EVENT_DIFFICULTY não entra aqui (só as runas).
+    """
+
+    def __init__(self, labels, dist):
+        self.slots = []                 # label de cada slot
+        self.active = 0                 # máscara dos slots ativos
+        self.d_start = np.zeros(0)      # i -> slot
+        self.d_end = np.zeros(0)        # slot -> Z
+        self.D_ev = np.zeros((0, 0))    # slot -> slot
+        self.dp = np.full((1, 0), np.inf)
+        self.parent = np.full((1, 0), -1, dtype=np.int8)
+        self.invalid = np.zeros(1, dtype=bool)
+        self.layers = _popcount_layers(0)
+        self.update(labels, dist)
+
+    def _grow(self, label):
+        """Acrescenta um slot: a metade de baixo das tabelas continua válida."""
+        n = len(self.slots)
+        size = 1 << n
+        dp = np.full((2 * size, n + 1), np.inf)
+        parent = np.full((2 * size, n + 1), -1, dtype=np.int8)
+        dp[:size, :n] = self.dp
+        parent[:size, :n] = self.parent
+        self.dp, self.parent = dp, parent
+        self.invalid = np.concatenate([self.invalid, np.ones(size, dtype=bool)])
+        self.d_start = np.append(self.d_start, np.inf)
+        self.d_end = np.append(self.d_end, np.inf)
+        D_ev = np.full((n + 1, n + 1), np.inf)
+        D_ev[:n, :n] = self.D_ev
+        D_ev[n, n] = 0
+        self.D_ev = D_ev
+        self.layers = _popcount_layers(n + 1)
+        self.slots.append(label)
+        return n
+
+    def _invalidate_slot(self, s):
+        masks = np.arange(len(self.invalid))
+        self.invalid |= ((masks >> s) & 1).astype(bool)
+
+    def update(self, labels, dist):
+        """
+        Sincroniza a sessão com (labels, dist) no formato de solve_tsp_path.
+        Eventos que sumiram de labels são desativados (as tabelas continuam e servem
+        se voltarem), eventos novos ganham slot e as distâncias são comparadas com
+        as guardadas para marcar as máscaras inválidas.
+        """
+        events = labels[1:-1]
+        row = {label: idx for idx, label in enumerate(labels)}
+        Z = len(labels) - 1
+        slot_of = {label: s for s, label in enumerate(self.slots)}
+        free = [s for s, label in enumerate(self.slots) if label not in row]
+        for label in events:
+            if label in slot_of:
+                continue
+            if len(self.slots) < DP_MAX_EVENTS:
+                s = self._grow(label)
+            elif free:
+                # tabelas no máximo: reaproveita o slot de um evento removido
+                s = free.pop(0)
+                self.slots[s] = label
+                self._invalidate_slot(s)
+            else:
+                raise ValueError(f"a sessão suporta no máximo {DP_MAX_EVENTS} eventos")
+            slot_of[label] = s
+        self.active = 0
+        for label in events:
+            self.active |= 1 << slot_of[label]
+
+        n = len(self.slots)
+        act = [s for s in range(n) if (self.active >> s) & 1]
+        idx = np.array([row[self.slots[s]] for s in act], dtype=np.int64)
+        D = np.array(dist, dtype=np.float64)
+        new_start = D[0, idx]
+        new_ev = D[np.ix_(idx, idx)]
+        self.d_end[act] = D[idx, Z]
+
+        masks = np.arange(1 << n)
+        changed_start = 0
+        for t, s in enumerate(act):
+            if new_start[t] != self.d_start[s]:
+                changed_start |= 1 << s
+        if changed_start:
+            self.invalid |= (masks & changed_start) != 0
+        old_ev = self.D_ev[np.ix_(act, act)]
+        changed = new_ev != old_ev
+        for t, s in enumerate(act):
+            partners = 0
+            for u in np.flatnonzero(changed[t] | changed[:, t]):
+                partners |= 1 << act[u]
+            if partners:
+                self.invalid |= (((masks >> s) & 1) != 0) & ((masks & partners) != 0)
+        self.d_start[act] = new_start
+        self.D_ev[np.ix_(act, act)] = new_ev
+
+    def solve(self, stats=None):
+        """
+        (custo, ordem) como solve_tsp_path para os eventos ativos. O custo é o mesmo;
+        em empates a ordem pode diferir se os slots não seguem a ordem de labels.
+        stats: dict opcional; recebe "recomputed" (máscaras recalculadas agora) e
+        "masks" (2^eventos ativos).
+        """
+        A = self.active
+        n_act = bin(A).count("1")
+        if stats is not None:
+            stats["recomputed"] = 0
+            stats["masks"] = 1 << n_act
+        if n_act == 0:
+            return 0, ['i', 'Z']
+        act = [s for s in range(len(self.slots)) if (A >> s) & 1]
+        if np.isinf(self.d_start[act]).any() or np.isinf(self.d_end[act]).any():
+            return INF, []
+
+        recomputed = 0
+        for s in act:
+            m = 1 << s
+            if self.invalid[m]:
+                self.dp[m, s] = self.d_start[s]
+                self.parent[m, s] = -1
+                self.invalid[m] = False
+                recomputed += 1
+        for k in range(2, n_act + 1):
+            layer = self.layers[k]
+            sel = layer[((layer & ~A) == 0) & self.invalid[layer]]
+            if sel.size == 0:
+                continue
+            _hk_layer(self.dp, self.parent, sel, self.D_ev, act)
+            self.invalid[sel] = False
+            recomputed += sel.size
+        if stats is not None:
+            stats["recomputed"] = recomputed
+
+        closing = self.dp[A] + self.d_end
+        last = int(closing.argmin())
+        best_cost = float(closing[last])
+        if best_cost == INF:
+            return INF, []
+        order = []
+        mask, j = A, last
+        while j != -1:
+            order.append(self.slots[j])
+            pj = int(self.parent[mask, j])
+            mask ^= 1 << j
+            j = pj
+        order.reverse()
+        return int(best_cost), ['i'] + order + ['Z']